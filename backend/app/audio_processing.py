@@ -0,0 +1,112 @@
+import os
+import io
+from math import gcd
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+from dotenv import load_dotenv
+from app.audio_upload import SpooledAudio
+from app.vad import VAD_MIN_SAVED_SECONDS, trim_silence
+
+load_dotenv()
+
+TARGET_SAMPLE_RATE = 16000
+# "WAV" (16-bit PCM) or "FLAC" (lossless, roughly half the size of WAV).
+NORMALIZED_AUDIO_FORMAT = os.getenv("NORMALIZED_AUDIO_FORMAT", "WAV").upper()
+VAD_AUDIO_FORMAT = os.getenv("VAD_AUDIO_FORMAT", "FLAC").upper()
+
+# Frames decoded per block; only one block of the source is in memory at once.
+AUDIO_DECODE_BLOCK_FRAMES = int(os.getenv("AUDIO_DECODE_BLOCK_FRAMES", str(1 << 18)))
+
+AUDIO_MIME_TYPES = {
+    "WAV": "audio/wav",
+    "FLAC": "audio/flac",
+}
+
+
+def audio_source(audio_content):
+    if isinstance(audio_content, SpooledAudio):
+        return audio_content.path
+    return io.BytesIO(audio_content)
+
+
+def downmix_to_mono(data: np.ndarray) -> np.ndarray:
+    if data.shape[1] == 1:
+        return data[:, 0]
+    return data.mean(axis=1, dtype=np.float32)
+
+
+# Polyphase resampling of a stream of blocks. Each step is resampled with
+# `pad` input samples of context on both sides, wide enough for the filter,
+# and steps are multiples of `down`, so the output matches one resample_poly
+# call over the whole signal. Leading and trailing zeros stand in for the
+# zero padding resample_poly applies at the edges.
+def resample_blocks(blocks, sample_rate: int, target_rate: int = TARGET_SAMPLE_RATE,
+                    block_frames: int = AUDIO_DECODE_BLOCK_FRAMES):
+    if sample_rate == target_rate:
+        yield from blocks
+        return
+    divisor = gcd(sample_rate, target_rate)
+    up, down = target_rate // divisor, sample_rate // divisor
+    pad = -(-10 * max(up, down) // up) + 1
+    pad = -(-pad // down) * down
+    step = max(1, block_frames // down) * down
+    offset = pad * up // down
+
+    pending = np.zeros(pad, dtype=np.float32)
+    for block in blocks:
+        pending = np.concatenate([pending, block])
+        while len(pending) >= step + 2 * pad:
+            resampled = resample_poly(pending[:step + 2 * pad], up, down)
+            yield resampled[offset:offset + step * up // down]
+            pending = pending[step:]
+
+    remaining = len(pending) - pad
+    if remaining > 0:
+        resampled = resample_poly(np.concatenate([pending, np.zeros(pad, dtype=np.float32)]), up, down)
+        yield resampled[offset:offset + -(-remaining * up // down)]
+
+
+# Decode block by block, downmix, and resample with a polyphase filter; the
+# result is a contiguous mono float32 array at 16 kHz, which every provider
+# accepts. Peak memory is the 16 kHz output plus one source block.
+def normalize_audio(audio_content) -> np.ndarray:
+    with sf.SoundFile(audio_source(audio_content)) as f:
+        blocks = (
+            downmix_to_mono(block)
+            for block in f.blocks(blocksize=AUDIO_DECODE_BLOCK_FRAMES, dtype="float32", always_2d=True)
+        )
+        pieces = [np.asarray(piece, dtype=np.float32) for piece in resample_blocks(blocks, f.samplerate)]
+    if not pieces:
+        return np.zeros(0, dtype=np.float32)
+    return np.ascontiguousarray(np.concatenate(pieces), dtype=np.float32)
+
+
+def encode_audio(samples: np.ndarray, file, audio_format: str = NORMALIZED_AUDIO_FORMAT):
+    sf.write(file, samples, TARGET_SAMPLE_RATE, format=audio_format, subtype="PCM_16")
+
+
+def trim_audio_for_upload(audio_content):
+    try:
+        samples = normalize_audio(audio_content)
+    except Exception as e:
+        print(f"VAD skipped, audio could not be decoded: {type(e).__name__}")
+        return audio_content, None
+
+    trimmed = trim_silence(samples, TARGET_SAMPLE_RATE)
+    del samples
+    if trimmed.original_seconds - trimmed.seconds < VAD_MIN_SAVED_SECONDS:
+        return audio_content, None
+
+    buffer = io.BytesIO()
+    encode_audio(trimmed.samples, buffer, VAD_AUDIO_FORMAT)
+    encoded = buffer.getvalue()
+    # Compressed uploads (webm/opus) can be smaller than the trimmed PCM.
+    if len(encoded) >= len(audio_content):
+        return audio_content, None
+
+    print(
+        f"VAD: kept {trimmed.seconds:.1f}s of {trimmed.original_seconds:.1f}s, "
+        f"{len(audio_content)} -> {len(encoded)} bytes"
+    )
+    return encoded, trimmed.time_map
@@ -0,0 +1,71 @@
+import os
+import hashlib
+import tempfile
+from typing import Iterator
+from dotenv import load_dotenv
+from fastapi import UploadFile
+
+load_dotenv()
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+# An uploaded recording spooled to a temporary file. The SHA-256 is computed
+# while spooling so the transcript cache never has to hold the audio in memory.
+class SpooledAudio:
+    def __init__(self, path: str, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def iter_chunks(self, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self.path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def close(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __len__(self):
+        return self.size
+
+
+def ensure_upload_size(size: int, max_bytes: int = MAX_UPLOAD_BYTES):
+    if size > max_bytes:
+        raise UploadTooLargeError(f"Audio file exceeds the maximum size of {max_bytes} bytes")
+
+
+async def spool_upload(upload: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> SpooledAudio:
+    if upload.size is not None:
+        ensure_upload_size(upload.size, max_bytes)
+
+    hasher = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(suffix=".audio", dir=UPLOAD_SPOOL_DIR)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                ensure_upload_size(size, max_bytes)
+                hasher.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return SpooledAudio(path, size, hasher.hexdigest())
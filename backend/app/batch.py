@@ -0,0 +1,54 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "50"))
+BATCH_DEFAULT_CONCURRENCY = int(os.getenv("BATCH_DEFAULT_CONCURRENCY", "4"))
+# Comma separated "name=limit" pairs, e.g. "deepgram_nova-3=8,whisper_hosted_api=2,llm=4".
+BATCH_CONCURRENCY_LIMITS = os.getenv("BATCH_CONCURRENCY_LIMITS", "")
+
+
+def parse_concurrency_limits(spec: str) -> dict:
+    limits = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        try:
+            limits[name.strip().lower()] = max(1, int(value))
+        except ValueError:
+            print(f"WARNING: ignoring invalid concurrency limit '{item}'")
+    return limits
+
+
+# One semaphore per upstream, shared by every batch on this worker, so two
+# concurrent batches cannot double the load on a provider.
+class ConcurrencyLimiter:
+    def __init__(self, limits: dict, default_limit: int):
+        self.limits = limits
+        self.default_limit = default_limit
+        self._semaphores = {}
+
+    def limit(self, name: str) -> asyncio.Semaphore:
+        name = name.lower()
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limits.get(name, self.default_limit))
+            self._semaphores[name] = semaphore
+        return semaphore
+
+
+batch_limiter = ConcurrencyLimiter(parse_concurrency_limits(BATCH_CONCURRENCY_LIMITS), BATCH_DEFAULT_CONCURRENCY)
+
+
+async def stream_as_completed(coroutines):
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
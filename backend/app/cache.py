@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class LRUCache:
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# One JSON file per entry; least recently used files are evicted once the
+# directory grows past max_bytes.
+class DiskCache:
+    def __init__(self, directory: str, max_bytes: int = 50 * 1024 * 1024, ttl_seconds: Optional[float] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._sizes = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        existing = []
+        for name in os.listdir(directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            existing.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(existing):
+            self._sizes[name] = size
+            self._total_bytes += size
+
+    def _filename(self, key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+
+    def _remove(self, name: str):
+        size = self._sizes.pop(name, 0)
+        self._total_bytes -= size
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[Any]:
+        name = self._filename(key)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if name not in self._sizes:
+                self.misses += 1
+                return None
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self._remove(name)
+                self.misses += 1
+                return None
+            expires_at = entry.get("expires_at")
+            if expires_at is not None and expires_at < time.time():
+                self._remove(name)
+                self.misses += 1
+                return None
+            self._sizes.move_to_end(name)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.hits += 1
+            return entry.get("value")
+
+    def set(self, key: str, value: Any):
+        name = self._filename(key)
+        path = os.path.join(self.directory, name)
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        data = json.dumps({"expires_at": expires_at, "value": value}, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError:
+                return
+            self._total_bytes -= self._sizes.pop(name, 0)
+            self._sizes[name] = len(data)
+            self._total_bytes += len(data)
+            while self._total_bytes > self.max_bytes and self._sizes:
+                oldest = next(iter(self._sizes))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._remove(self._filename(key))
+
+    def clear(self):
+        with self._lock:
+            for name in list(self._sizes):
+                self._remove(name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._sizes),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class TieredCache:
+    def __init__(self, memory: LRUCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        value = self.disk.get(key)
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None
+        }
+
+
+def build_tiered_cache(max_entries: int, ttl_seconds: float, directory: str = "", max_bytes: int = 0) -> TieredCache:
+    ttl = ttl_seconds if ttl_seconds > 0 else None
+    disk = DiskCache(directory, max_bytes=max_bytes, ttl_seconds=ttl) if directory else None
+    return TieredCache(LRUCache(max_entries=max_entries, ttl_seconds=ttl), disk)
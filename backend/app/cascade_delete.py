@@ -0,0 +1,60 @@
+import asyncio
+from app.database import get_firestore_db
+from app.document_cache import document_cache
+from app.firestore_helpers import PATIENT_DOCUMENT_COLLECTIONS, run_in_firestore_executor
+
+FIRESTORE_BATCH_LIMIT = 500
+FIRESTORE_IN_QUERY_LIMIT = 30
+
+
+def _collect_references(db, collection_name: str, patient_ids: list) -> list:
+    references = []
+    for index in range(0, len(patient_ids), FIRESTORE_IN_QUERY_LIMIT):
+        chunk = patient_ids[index:index + FIRESTORE_IN_QUERY_LIMIT]
+        collection = db.collection(collection_name)
+        if len(chunk) == 1:
+            query = collection.where('patient_id', '==', chunk[0])
+        else:
+            query = collection.where('patient_id', 'in', chunk)
+        # Only references are needed, so no field data is transferred.
+        references.extend(doc.reference for doc in query.select([]).stream())
+    return references
+
+
+def _commit_deletes(db, references: list) -> int:
+    batch = db.batch()
+    for reference in references:
+        batch.delete(reference)
+    batch.commit()
+    for reference in references:
+        document_cache.invalidate_reference(reference)
+    return len(references)
+
+
+async def _delete_in_batches(db, references: list):
+    await asyncio.gather(*(
+        run_in_firestore_executor(_commit_deletes, db, references[index:index + FIRESTORE_BATCH_LIMIT])
+        for index in range(0, len(references), FIRESTORE_BATCH_LIMIT)
+    ))
+
+
+# All dependent collections are queried concurrently and their documents are
+# removed in batched writes of up to 500 deletes. Patient documents go last, so
+# a failure part-way never leaves forms without their patient.
+async def cascade_delete_patients(patient_ids: list) -> dict:
+    db = get_firestore_db()
+    reference_lists = await asyncio.gather(*(
+        run_in_firestore_executor(_collect_references, db, collection_name, patient_ids)
+        for collection_name in PATIENT_DOCUMENT_COLLECTIONS
+    ))
+
+    deleted_counts = {}
+    document_references = []
+    for collection_name, references in zip(PATIENT_DOCUMENT_COLLECTIONS, reference_lists):
+        deleted_counts[collection_name] = len(references)
+        document_references.extend(references)
+
+    await _delete_in_batches(db, document_references)
+    patients_ref = db.collection('patients')
+    await _delete_in_batches(db, [patients_ref.document(str(patient_id)) for patient_id in patient_ids])
+    return deleted_counts
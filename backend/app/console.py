@@ -0,0 +1,14 @@
+def safe_encode_str(s):
+    try:
+        if isinstance(s, bytes):
+            s = s.decode('utf-8', errors='replace')
+        return str(s).encode('ascii', 'replace').decode('ascii')
+    except:
+        return repr(s)
+
+def safe_print(msg):
+    try:
+        safe_msg = safe_encode_str(msg)
+        print(safe_msg)
+    except:
+        print(repr(msg))
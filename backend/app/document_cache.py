@@ -0,0 +1,81 @@
+import os
+from typing import Optional
+from dotenv import load_dotenv
+from app.cache import LRUCache
+from app.database import get_firestore_db
+
+load_dotenv()
+
+DOCUMENT_CACHE_MAX_ENTRIES = int(os.getenv("DOCUMENT_CACHE_MAX_ENTRIES", "4096"))
+# Bounds how long a write made by another process can go unseen.
+DOCUMENT_CACHE_TTL_SECONDS = float(os.getenv("DOCUMENT_CACHE_TTL_SECONDS", "60"))
+
+
+# Read-through cache of single Firestore documents keyed by collection and
+# document ID. Writes go through the same object, so this process never
+# serves its own stale data. Callers get copies and may mutate them freely.
+class DocumentCache:
+    def __init__(self, max_entries: int = DOCUMENT_CACHE_MAX_ENTRIES, ttl_seconds: float = DOCUMENT_CACHE_TTL_SECONDS):
+        self._cache = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds if ttl_seconds > 0 else None)
+        self.writes = 0
+        self.invalidations = 0
+
+    def _key(self, collection_name: str, document_id) -> str:
+        return f"{collection_name}/{document_id}"
+
+    def _reference(self, collection_name: str, document_id):
+        return get_firestore_db().collection(collection_name).document(str(document_id))
+
+    def get(self, collection_name: str, document_id) -> Optional[dict]:
+        key = self._key(collection_name, document_id)
+        data = self._cache.get(key)
+        if data is None:
+            snapshot = self._reference(collection_name, document_id).get()
+            if not snapshot.exists:
+                return None
+            data = snapshot.to_dict()
+            self._cache.set(key, data)
+        return dict(data)
+
+    # Documents already read by a list query are kept, so opening one of them
+    # right after listing costs no extra read.
+    def prime(self, snapshot):
+        if snapshot.exists:
+            self._cache.set(self._key(snapshot.reference.parent.id, snapshot.id), snapshot.to_dict())
+
+    def set(self, collection_name: str, document_id, data: dict) -> dict:
+        self._reference(collection_name, document_id).set(data)
+        self.writes += 1
+        self._cache.set(self._key(collection_name, document_id), dict(data))
+        return dict(data)
+
+    # `current` is the document as returned by get(); the merged result is
+    # what Firestore now holds, so no read-back is needed.
+    def update(self, collection_name: str, document_id, current: dict, changes: dict) -> dict:
+        self._reference(collection_name, document_id).update(changes)
+        self.writes += 1
+        merged = {**current, **changes}
+        self._cache.set(self._key(collection_name, document_id), merged)
+        return dict(merged)
+
+    def delete(self, collection_name: str, document_id):
+        self._reference(collection_name, document_id).delete()
+        self.writes += 1
+        self.invalidate(collection_name, document_id)
+
+    def invalidate(self, collection_name: str, document_id):
+        self.invalidations += 1
+        self._cache.delete(self._key(collection_name, document_id))
+
+    def invalidate_reference(self, reference):
+        self.invalidate(reference.parent.id, reference.id)
+
+    def stats(self) -> dict:
+        return {
+            **self._cache.stats(),
+            "writes": self.writes,
+            "invalidations": self.invalidations
+        }
+
+
+document_cache = DocumentCache()
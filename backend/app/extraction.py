@@ -0,0 +1,328 @@
+import os
+import re
+import json
+import hashlib
+import asyncio
+from functools import lru_cache
+from typing import NamedTuple
+from dotenv import load_dotenv
+from app.console import safe_print
+from app.extraction_backends import BackendUnavailableError, get_extraction_backend
+from app.cache import build_tiered_cache
+from app.form_schemas import FORM_SCHEMAS
+from app.label_index import label_prefix_variants, strip_prefix_variants
+from app.json_stream import IncrementalJSONParser, parse_json_object
+
+load_dotenv()
+
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "512"))
+EXTRACTION_CACHE_TTL_SECONDS = float(os.getenv("EXTRACTION_CACHE_TTL_SECONDS", "604800"))
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", "")
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+SCHEMA_REGISTRY_MAX_ENTRIES = int(os.getenv("SCHEMA_REGISTRY_MAX_ENTRIES", "256"))
+# Map-reduce extraction: larger field sets and longer transcripts are split
+# into chunks that are extracted concurrently and merged afterwards.
+EXTRACTION_FIELDS_PER_CHUNK = int(os.getenv("EXTRACTION_FIELDS_PER_CHUNK", "8"))
+EXTRACTION_TRANSCRIPT_CHUNK_CHARS = int(os.getenv("EXTRACTION_TRANSCRIPT_CHUNK_CHARS", "6000"))
+EXTRACTION_TRANSCRIPT_OVERLAP_CHARS = int(os.getenv("EXTRACTION_TRANSCRIPT_OVERLAP_CHARS", "400"))
+EXTRACTION_MAX_CONCURRENCY = int(os.getenv("EXTRACTION_MAX_CONCURRENCY", "4"))
+
+EXTRACTION_FAILED_PREFIX = "Extraction failed"
+
+SYSTEM_PROMPT = (
+    "Sunteți un asistent expert în extragerea informațiilor din text medical transcrit. "
+    "Analizați cu atenție textul și extrageți informațiile solicitate de utilizator. "
+    "Răspunsul trebuie să fie STRICT un JSON valid care respectă schema furnizată. "
+    "Nu includeți niciun text suplimentar, explicații sau caractere înainte sau după JSON. "
+    "IMPORTANT: Toate valorile trebuie să fie STRING-uri simple, NU liste, NU array-uri, NU obiecte. "
+    "Dacă există multiple informații pentru un câmp, combinați-le într-un singur string, separând cu virgulă sau punct. "
+    "CRITICAL: Când extrageți valoarea pentru un câmp, NU includeți numele câmpului în valoarea extrasă. "
+    "Extrageți DOAR textul care apare DUPĂ numele câmpului, fără a include numele câmpului însuși. "
+    "De exemplu, dacă textul spune 'Diagnostic, are probleme cu inima', extrageți DOAR 'are probleme cu inima', NU 'Diagnostic, are probleme cu inima'. "
+    "Când căutați informații pentru un câmp, căutați variații ale numelui câmpului în text (ignorați diferențe de majuscule/minuscule și variații de formulare). "
+    "Exemple de variații acceptate: 'istoricul prezent' = 'istoric bolii prezente' = 'istoricul bolii prezente' = 'istoric prezent'. "
+    "Exemple de variații acceptate: 'examinare fizica' = 'examinare fizică' = 'examinare fizica,'. "
+    "Dacă un câmp apare în text urmat de virgulă sau două puncte, extrageți tot textul care urmează până la următorul câmp sau până la sfârșitul propoziției. "
+    "Extrageți EXACT textul care apare după numele câmpului (fără numele câmpului), chiar dacă pare neclar sau conține erori. "
+    "Valorile extrase trebuie să includă întotdeauna unitatea de măsură când este relevant (de exemplu, '10 milimetri', '40kg', '9cm', '2 bete', '3 paduri'). "
+    "Dacă nu se găsesc informații pentru o cheie, utilizați exact valoarea 'null'. "
+    "Adauga unitatile de masura utilizate in Romania pentru fiecare dimensiune extrasa. Exemplu: '10 milimetri', '20 centimetri', '30 metri', '40 mm', '50 cm', '60 m', '40kg'. "
+    "Exemplu corect: {\"simptome\": \"tuse seacă, durere în gât, febră ușoară\"} - NU {\"simptome\": [\"tuse seacă\", \"durere în gât\"]}"
+)
+
+
+# The transcript is the only per-request part of the prompt and comes last, so
+# everything before it is a stable prefix the LLM provider can cache.
+PROMPT_INTRO = "Vă rugăm să extrageți informațiile din textul transcris de la final pe baza schemei JSON furnizate."
+PROMPT_INSTRUCTIONS = """
+INSTRUCȚIUNI CRITICE:
+1. Căutați în text variații ale numelor câmpurilor (ignorați diferențe de majuscule/minuscule și variații de formulare)
+   - Exemple: "istoricul prezent" = "istoric bolii prezente" = "istoricul bolii prezente" = "istoric prezent"
+   - Exemple: "examinare fizica" = "examinare fizică" = "examinare fizica,"
+   - Exemple: "plangere principala" = "plângerea principală" = "plangerea principala"
+2. Extrageți DOAR textul care apare DUPĂ numele câmpului, FĂRĂ a include numele câmpului în valoarea extrasă
+   - Dacă textul spune "Diagnostic, are probleme cu inima", extrageți DOAR "are probleme cu inima"
+   - Dacă textul spune "Plan de tratament, 7 pastile", extrageți DOAR "7 pastile"
+   - Dacă textul spune "Examinare fizica, 40kg, 2 bete", extrageți DOAR "40kg, 2 bete"
+3. Extrageți tot textul care apare după numele câmpului până la următorul câmp sau sfârșitul propoziției
+4. Păstrați textul exact așa cum apare, chiar dacă conține erori sau pare neclar
+5. Dacă un câmp nu este găsit în text, folosiți "null"
+"""
+PROMPT_TRANSCRIPT_HEADER = 'TEXT TRANSCRIS:\n"'
+PROMPT_SUFFIX = '"\n\nJSON OUTPUT (doar JSON, fără text suplimentar):\n'
+
+_SENTENCE_END_REGEX = re.compile(r"[.!?;]\s+|\n+")
+
+
+# Extraction runs at temperature 0, so the same model, schema and transcript
+# always yield the same answer.
+extraction_cache = build_tiered_cache(
+    max_entries=EXTRACTION_CACHE_MAX_ENTRIES,
+    ttl_seconds=EXTRACTION_CACHE_TTL_SECONDS,
+    directory=EXTRACTION_CACHE_DIR,
+    max_bytes=EXTRACTION_CACHE_MAX_BYTES
+)
+
+
+class CompiledSchema(NamedTuple):
+    form_type: str
+    fields: tuple
+    schema_json: str
+    fingerprint: str
+    prompt_prefix: str
+    strip_rules: dict
+
+
+def build_schema_dict(form_type: str, fields: tuple) -> dict:
+    if form_type and form_type in FORM_SCHEMAS:
+        predefined_schema = FORM_SCHEMAS[form_type]
+        return {
+            field: predefined_schema.get(field, f"valoarea pentru {field}")
+            for field in fields
+        }
+    return {field: f"dimensiunea in mm pentru {field}" for field in fields}
+
+
+# Everything derived from (form_type, fields) is rendered once; a request only
+# concatenates its transcript onto the cached prompt prefix.
+@lru_cache(maxsize=SCHEMA_REGISTRY_MAX_ENTRIES)
+def compile_schema(form_type: str, fields: tuple) -> CompiledSchema:
+    schema_dict = build_schema_dict(form_type, fields)
+    schema_json = json.dumps(schema_dict, indent=2, ensure_ascii=False)
+    normalized_schema = json.dumps(schema_dict, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    prompt_prefix = (
+        f"\n{PROMPT_INTRO}\n\n"
+        f"SCHEMA JSON (cheile sunt numele câmpurilor, valorile sunt descrieri):\n{schema_json}\n"
+        f"{PROMPT_INSTRUCTIONS}\n"
+        f"{PROMPT_TRANSCRIPT_HEADER}"
+    )
+    if form_type and form_type in FORM_SCHEMAS:
+        safe_print(f"Compiled predefined schema for form type: {form_type} ({len(fields)} fields)")
+    else:
+        safe_print(f"Compiled dynamically generated schema ({len(fields)} fields)")
+    return CompiledSchema(
+        form_type=form_type,
+        fields=fields,
+        schema_json=schema_json,
+        fingerprint=hashlib.sha256(normalized_schema.encode("utf-8")).hexdigest(),
+        prompt_prefix=prompt_prefix,
+        strip_rules={field: label_prefix_variants(field) for field in fields}
+    )
+
+
+def get_compiled_schema(form_type: str, target_fields: list) -> CompiledSchema:
+    if form_type not in FORM_SCHEMAS:
+        form_type = None
+    return compile_schema(form_type, tuple(target_fields))
+
+
+def build_messages(compiled: CompiledSchema, text_to_analyze: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": compiled.prompt_prefix + text_to_analyze + PROMPT_SUFFIX}
+    ]
+
+
+def extraction_cache_key(model_id: str, compiled: CompiledSchema, text_to_analyze: str) -> str:
+    key_source = "\x00".join([model_id, compiled.fingerprint, text_to_analyze.strip()])
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+def extract_strict_json(response_text):
+    return parse_json_object(response_text)[0]
+
+
+async def extract_data_with_api(text_to_analyze: str, compiled: CompiledSchema, on_pair=None, use_cache: bool = True):
+    backend = get_extraction_backend()
+    cache_key = extraction_cache_key(backend.model_id, compiled, text_to_analyze)
+    cached_response = extraction_cache.get(cache_key) if use_cache else None
+    if cached_response is not None:
+        safe_print("Extraction cache hit")
+        if on_pair is not None:
+            for key, value in IncrementalJSONParser().feed(cached_response):
+                await on_pair(key, value)
+        return cached_response
+    
+    parts = []
+    parser = IncrementalJSONParser()
+    
+    async def on_delta(delta):
+        parts.append(delta)
+        if on_pair is not None:
+            for key, value in parser.feed(delta):
+                await on_pair(key, value)
+    
+    try:
+        response_text = await backend.complete(build_messages(compiled, text_to_analyze), 512, on_delta)
+        # A reply cut off at max_tokens would be served again on every retry.
+        if use_cache and response_text and parse_json_object(response_text)[1]:
+            extraction_cache.set(cache_key, response_text)
+        return response_text
+    
+    except BackendUnavailableError as e:
+        print(f"ERROR: extraction backend '{backend.name}' unavailable: {e}")
+        return f"{EXTRACTION_FAILED_PREFIX}: {e}"
+    except Exception as e:
+        error_msg = f"{EXTRACTION_FAILED_PREFIX} due to API error: {e}"
+        safe_print(f"ERROR in extract_data_with_api: {error_msg}")
+        if parts:
+            # Generation broke off midway; the pairs completed so far are
+            # still usable, but the text is not cached.
+            return "".join(parts)
+        return error_msg
+
+
+def postprocess_value(compiled: CompiledSchema, field: str, value) -> str:
+    if value is None or value == "null":
+        return ""
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return str(value)
+    return strip_prefix_variants(str(value), compiled.strip_rules[field])
+
+
+def postprocess_extracted_values(compiled: CompiledSchema, parsed_json) -> dict:
+    if parsed_json is None:
+        return {field: "" for field in compiled.fields}
+    return {field: postprocess_value(compiled, field, parsed_json.get(field)) for field in compiled.fields}
+
+
+def split_fields(fields: list, chunk_size: int = EXTRACTION_FIELDS_PER_CHUNK) -> list:
+    chunk_size = max(1, chunk_size)
+    return [fields[index:index + chunk_size] for index in range(0, len(fields), chunk_size)]
+
+
+def split_transcript(text: str, max_chars: int = EXTRACTION_TRANSCRIPT_CHUNK_CHARS,
+                     overlap_chars: int = EXTRACTION_TRANSCRIPT_OVERLAP_CHARS) -> list:
+    if len(text) <= max_chars:
+        return [text]
+    
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + max_chars)
+        if end < len(text):
+            # Prefer a sentence boundary in the second half of the window,
+            # then a word boundary, so a field value is rarely cut in two.
+            cut = None
+            for match in _SENTENCE_END_REGEX.finditer(text, start + max_chars // 2, end):
+                cut = match.end()
+            if cut is None:
+                space = text.rfind(" ", start + max_chars // 2, end)
+                cut = space + 1 if space > start else end
+            end = cut
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        next_start = max(start + 1, end - overlap_chars)
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space >= 0 else next_start
+    return [chunk for chunk in chunks if chunk]
+
+
+def contains_words(text: str, fragment: str) -> bool:
+    return re.search(r"(?<!\w)" + re.escape(fragment) + r"(?!\w)", text) is not None
+
+
+def merge_chunk_values(target_fields: list, partials: list) -> dict:
+    merged = {}
+    for field in target_fields:
+        values = []
+        for partial in partials:
+            value = partial.get(field, "")
+            if value and value not in values:
+                values.append(value)
+        # Overlapping transcript chunks repeat text; a value contained in a
+        # longer one from another chunk is the same dictation seen twice.
+        values = [
+            value for value in values
+            if not any(value != other and contains_words(other, value) for other in values)
+        ]
+        merged[field] = ", ".join(values)
+    return merged
+
+
+async def extract_fields(raw_transcript: str, target_fields: list, form_type: str = None, on_field=None,
+                         use_cache: bool = True) -> dict:
+    compiled = get_compiled_schema(form_type, target_fields)
+    
+    on_pair = None
+    if on_field is not None:
+        async def on_pair(key, value):
+            if key in compiled.strip_rules:
+                await on_field(key, postprocess_value(compiled, key, value))
+    
+    response_text = await extract_data_with_api(raw_transcript, compiled, on_pair=on_pair, use_cache=use_cache)
+    parsed_json, complete = parse_json_object(response_text)
+    
+    # An unfinished object from a reachable API is almost always a response
+    # cut off at max_tokens. Completed pairs are kept and only the missing
+    # fields are asked for again; with nothing salvageable the set is halved.
+    if (not complete and len(target_fields) > 1 and response_text
+            and not response_text.startswith(EXTRACTION_FAILED_PREFIX)):
+        salvaged = {field: parsed_json[field] for field in target_fields if parsed_json and field in parsed_json}
+        missing_fields = [field for field in target_fields if field not in salvaged]
+        if salvaged and missing_fields:
+            safe_print(f"Extraction output incomplete, retrying {len(missing_fields)}/{len(target_fields)} fields")
+            result = postprocess_extracted_values(compiled, salvaged)
+            result.update(await extract_fields(raw_transcript, missing_fields, form_type, on_field, use_cache))
+            return result
+        if not salvaged:
+            middle = len(target_fields) // 2
+            safe_print(f"Extraction output unparseable, retrying as {middle} + {len(target_fields) - middle} fields")
+            left, right = await asyncio.gather(
+                extract_fields(raw_transcript, target_fields[:middle], form_type, on_field, use_cache),
+                extract_fields(raw_transcript, target_fields[middle:], form_type, on_field, use_cache)
+            )
+            return {**left, **right}
+    
+    return postprocess_extracted_values(compiled, parsed_json)
+
+
+async def parse_transcript_with_llm(raw_transcript: str, target_fields: list, form_type: str = None, on_field=None,
+                                    use_cache: bool = True) -> dict:
+    target_fields = list(target_fields)
+    field_chunks = split_fields(target_fields)
+    transcript_chunks = split_transcript(raw_transcript)
+    if len(field_chunks) <= 1 and len(transcript_chunks) <= 1:
+        return await extract_fields(raw_transcript, target_fields, form_type, on_field, use_cache)
+    
+    # Values from one transcript chunk may still be extended by the merge, so
+    # they are only reported early when the transcript was not split.
+    chunk_on_field = on_field if len(transcript_chunks) == 1 else None
+    safe_print(f"Map-reduce extraction: {len(transcript_chunks)} transcript chunks x {len(field_chunks)} field chunks")
+    # Bounds the calls of this one fan-out only; separate requests and jobs
+    # are not throttled against each other here.
+    fan_out = asyncio.Semaphore(EXTRACTION_MAX_CONCURRENCY)
+    
+    async def extract_chunk(transcript_chunk: str, field_chunk: list) -> dict:
+        async with fan_out:
+            return await extract_fields(transcript_chunk, field_chunk, form_type, chunk_on_field, use_cache)
+    
+    partials = await asyncio.gather(*(
+        extract_chunk(transcript_chunk, field_chunk)
+        for transcript_chunk in transcript_chunks
+        for field_chunk in field_chunks
+    ))
+    return merge_chunk_values(target_fields, partials)
@@ -0,0 +1,230 @@
+import os
+import json
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from app.console import safe_print
+from app.http_clients import get_llm_router_client
+
+try:
+    from llama_cpp import Llama, LlamaRAMCache
+except ImportError:
+    Llama = None
+    LlamaRAMCache = None
+
+load_dotenv()
+
+# "router" (remote OpenAI-compatible API) or "llama_cpp" (in-process GGUF model).
+EXTRACTION_BACKEND = os.getenv("EXTRACTION_BACKEND", "router")
+
+HF_TOKEN = os.getenv("HF_TOKEN", "")
+MODEL_ID = os.getenv("LLM_ROUTER_MODEL_ID", "google/gemma-2-2b-it")
+LLM_ROUTER_URL = os.getenv("LLM_ROUTER_URL", "https://router.huggingface.co/v1/chat/completions")
+LLM_STREAM_RESPONSES = os.getenv("LLM_STREAM_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+LOCAL_LLM_MODEL_PATH = os.getenv("LOCAL_LLM_MODEL_PATH", "")
+LOCAL_LLM_THREADS = int(os.getenv("LOCAL_LLM_THREADS", str(os.cpu_count() or 4)))
+LOCAL_LLM_CONTEXT_TOKENS = int(os.getenv("LOCAL_LLM_CONTEXT_TOKENS", "4096"))
+LOCAL_LLM_BATCH_SIZE = int(os.getenv("LOCAL_LLM_BATCH_SIZE", "8"))
+LOCAL_LLM_PROMPT_CACHE_BYTES = int(os.getenv("LOCAL_LLM_PROMPT_CACHE_BYTES", str(512 * 1024 * 1024)))
+
+
+class BackendUnavailableError(Exception):
+    pass
+
+
+class ExtractionBackend(ABC):
+    name = "base"
+    model_id = ""
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    async def complete(self, messages: list, max_tokens: int, on_delta=None) -> str:
+        pass
+
+
+class RouterBackend(ExtractionBackend):
+    name = "router"
+
+    def __init__(self, model_id: str = MODEL_ID, url: str = LLM_ROUTER_URL, token: str = HF_TOKEN,
+                 stream: bool = LLM_STREAM_RESPONSES):
+        self.model_id = model_id
+        self.url = url
+        self.token = token
+        self.stream = stream
+
+    async def complete(self, messages: list, max_tokens: int, on_delta=None) -> str:
+        if not self.token:
+            raise BackendUnavailableError("Missing API Key.")
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": self.model_id,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": 0.0
+        }
+        client = get_llm_router_client()
+        if not self.stream:
+            response = await client.post(self.url, headers=headers, json=payload, timeout=30.0)
+            response.raise_for_status()
+            response_text = response.json()["choices"][0]["message"]["content"]
+            if on_delta is not None and response_text:
+                await on_delta(response_text)
+            return response_text
+
+        parts = []
+        async with client.stream("POST", self.url, headers=headers, json={**payload, "stream": True}, timeout=30.0) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                if not delta:
+                    continue
+                parts.append(delta)
+                if on_delta is not None:
+                    await on_delta(delta)
+        return "".join(parts)
+
+
+# One quantized GGUF model in-process. llama.cpp is not thread-safe per model,
+# so all generation runs on a single worker thread that itself uses
+# LOCAL_LLM_THREADS cores. Requests waiting at the same time are taken as one
+# batch, ordered so that prompts sharing a schema prefix run back to back and
+# reuse the KV state held in the RAM prompt cache.
+class LlamaCppBackend(ExtractionBackend):
+    name = "llama_cpp"
+
+    def __init__(self, model_path: str = LOCAL_LLM_MODEL_PATH, threads: int = LOCAL_LLM_THREADS,
+                 context_tokens: int = LOCAL_LLM_CONTEXT_TOKENS, batch_size: int = LOCAL_LLM_BATCH_SIZE):
+        self.model_path = model_path
+        self.model_id = f"llama_cpp:{os.path.basename(model_path)}"
+        self.threads = max(1, threads)
+        self.context_tokens = context_tokens
+        self.batch_size = max(1, batch_size)
+        self._model = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-llm")
+        self._pending = None
+        self._batch_task = None
+
+    def _load(self):
+        model = Llama(
+            model_path=self.model_path,
+            n_ctx=self.context_tokens,
+            n_threads=self.threads,
+            verbose=False
+        )
+        if LlamaRAMCache is not None and LOCAL_LLM_PROMPT_CACHE_BYTES > 0:
+            model.set_cache(LlamaRAMCache(capacity_bytes=LOCAL_LLM_PROMPT_CACHE_BYTES))
+        # Warm-up: the first evaluation pays for weight paging and allocations.
+        model.create_chat_completion(messages=[{"role": "user", "content": "{}"}], max_tokens=1, temperature=0.0)
+        return model
+
+    async def start(self):
+        if Llama is None:
+            raise BackendUnavailableError("llama-cpp-python is not installed")
+        if not self.model_path or not os.path.exists(self.model_path):
+            raise BackendUnavailableError(f"Local LLM model not found: {self.model_path or '(LOCAL_LLM_MODEL_PATH not set)'}")
+        loop = asyncio.get_running_loop()
+        self._model = await loop.run_in_executor(self._executor, self._load)
+        self._pending = asyncio.Queue()
+        self._batch_task = asyncio.create_task(self._batch_loop())
+        safe_print(f"Local LLM ready: {self.model_id} ({self.threads} threads)")
+
+    async def stop(self):
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+            await asyncio.gather(self._batch_task, return_exceptions=True)
+            self._batch_task = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def complete(self, messages: list, max_tokens: int, on_delta=None) -> str:
+        if self._pending is None:
+            raise BackendUnavailableError("Local LLM backend is not started")
+        loop = asyncio.get_running_loop()
+        deltas = asyncio.Queue()
+        await self._pending.put((messages, max_tokens, deltas, loop))
+        parts = []
+        while True:
+            item = await deltas.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            parts.append(item)
+            if on_delta is not None:
+                await on_delta(item)
+        return "".join(parts)
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._pending.get()]
+            while len(batch) < self.batch_size and not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+            batch.sort(key=lambda request: json.dumps(request[0], ensure_ascii=False))
+            await loop.run_in_executor(self._executor, self._run_batch, batch)
+
+    def _run_batch(self, batch: list):
+        for messages, max_tokens, deltas, loop in batch:
+            try:
+                for chunk in self._model.create_chat_completion(
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=0.0,
+                    stream=True
+                ):
+                    delta = chunk["choices"][0]["delta"].get("content")
+                    if delta:
+                        loop.call_soon_threadsafe(deltas.put_nowait, delta)
+                loop.call_soon_threadsafe(deltas.put_nowait, None)
+            except Exception as e:
+                loop.call_soon_threadsafe(deltas.put_nowait, e)
+
+
+EXTRACTION_BACKENDS = {
+    "router": RouterBackend,
+    "llama_cpp": LlamaCppBackend,
+}
+
+_extraction_backend = None
+
+
+def get_extraction_backend() -> ExtractionBackend:
+    global _extraction_backend
+    if _extraction_backend is None:
+        factory = EXTRACTION_BACKENDS.get(EXTRACTION_BACKEND.lower())
+        if factory is None:
+            raise ValueError(f"Unsupported extraction backend: {EXTRACTION_BACKEND}")
+        _extraction_backend = factory()
+    return _extraction_backend
+
+
+async def start_extraction_backend():
+    global _extraction_backend
+    backend = get_extraction_backend()
+    try:
+        await backend.start()
+    except BackendUnavailableError as e:
+        # The service stays usable through the remote router when the local
+        # model cannot be loaded.
+        safe_print(f"WARNING: extraction backend '{backend.name}' unavailable ({e}), falling back to router")
+        _extraction_backend = RouterBackend()
+
+
+async def stop_extraction_backend():
+    if _extraction_backend is not None:
+        await _extraction_backend.stop()
@@ -1,17 +1,76 @@
+import os
+import asyncio
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from firebase_admin import firestore
 from app.database import get_firestore_db
 
+PATIENT_DOCUMENT_COLLECTIONS = (
+    'prescription_forms',
+    'consultation_forms',
+    'medical_reports',
+    'new_patient_forms',
+    'echocardiography_forms',
+)
+FIRESTORE_MAX_WORKERS = int(os.getenv("FIRESTORE_MAX_WORKERS", "16"))
+
+# The Firestore client is blocking; independent queries and commits run side by
+# side on this pool instead of one after another on the event loop.
+_firestore_executor = ThreadPoolExecutor(
+    max_workers=FIRESTORE_MAX_WORKERS,
+    thread_name_prefix="firestore"
+)
+
+
+async def run_in_firestore_executor(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_firestore_executor, partial(fn, *args, **kwargs))
+
+# IDs are reserved from the shared counter in blocks and handed out from an
+# in-process range, so one transaction serves ID_BLOCK_SIZE inserts. IDs left
+# in a block when the process exits are skipped, never reused.
+ID_BLOCK_SIZE = int(os.getenv("ID_BLOCK_SIZE", "20"))
+
+
+def _reserve_id_block(transaction, counter_ref, block_size: int) -> int:
+    snapshot = counter_ref.get(transaction=transaction)
+    current = snapshot.to_dict().get('count', 0) if snapshot.exists else 0
+    transaction.set(counter_ref, {'count': current + block_size}, merge=True)
+    return current + 1
+
+
+class IdAllocator:
+    def __init__(self, block_size: int = ID_BLOCK_SIZE):
+        self.block_size = max(1, block_size)
+        self._ranges = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock_for(self, collection_name: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(collection_name, threading.Lock())
+
+    def next_id(self, collection_name: str) -> int:
+        with self._lock_for(collection_name):
+            next_id, end = self._ranges.get(collection_name, (0, 0))
+            if next_id >= end:
+                db = get_firestore_db()
+                counter_ref = db.collection('_counters').document(collection_name)
+                # The transactional wrapper keeps per-call retry state, so
+                # each reservation gets its own.
+                reserve = firestore.transactional(_reserve_id_block)
+                next_id = reserve(db.transaction(), counter_ref, self.block_size)
+                end = next_id + self.block_size
+            self._ranges[collection_name] = (next_id + 1, end)
+            return next_id
+
+
+id_allocator = IdAllocator()
+
 
 def get_next_id(collection_name: str) -> int:
-    db = get_firestore_db()
-    counter_ref = db.collection('_counters').document(collection_name)
-    counter_doc = counter_ref.get()
-    if counter_doc.exists:
-        next_id = counter_doc.to_dict().get('count', 0) + 1
-    else:
-        next_id = 1
-    counter_ref.set({'count': next_id}, merge=True)
-    return next_id
+    return id_allocator.next_id(collection_name)
 
 
 def doc_to_dict(doc, include_id=True):
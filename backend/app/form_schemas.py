@@ -0,0 +1,49 @@
+FORM_SCHEMAS = {
+    "echocardiography": {
+        "aorta la inel": "dimensiunea in mm a aortei la inel",
+        "aorta la sinusur levart sagva": "dimensiunea in mm a aortei la sinusur levart sagva",
+        "aorta ascendenta": "dimensiunea in mm a aortei ascendente",
+        "ventricul drept": "dimensiunea in mm a ventriculului drept",
+        "atriu stang": "dimensiunea in mm a atriului stang",
+        "as": "dimensiunea in mm a atriului stang (prescurtat)",
+        "vd": "dimensiunea in mm a ventriculului drept (prescurtat)"
+    },
+    "medical-report": {
+        "plangere principala": "plângerea principală a pacientului, motivul principal pentru consultație",
+        "istoricul prezent": "istoricul bolii prezente, descrierea detaliată a simptomelor și evoluției",
+        "examinare fizica": "rezultatele examinării fizice, observațiile clinice",
+        "diagnostic": "diagnosticul medical stabilit",
+        "tratament": "planul de tratament recomandat",
+        "recomandari": "recomandări pentru urmărire și monitorizare"
+    },
+    "consultation-form": {
+        "simptome": "simptomele prezente și plângerile pacientului",
+        "semne vitale": "semnele vitale măsurate (tensiune arterială, temperatură, puls, etc.)",
+        "evaluare": "evaluarea clinică și concluziile medicale",
+        "plan": "planul de tratament și urmărire"
+    },
+    "prescription-form": {
+        "medicamente": "numele medicamentelor prescrise",
+        "dozaj": "dozajul și frecvența de administrare",
+        "instructiuni": "instrucțiuni speciale și avertismente",
+        "urmarire": "instrucțiuni pentru urmărire și control"
+    },
+    "first-time-new-patient": {
+        "nume pacient": "numele complet al pacientului",
+        "data nasterii": "data nașterii pacientului",
+        "gen": "genul pacientului",
+        "informatii contact": "informații de contact (telefon, email, contact de urgență)",
+        "plangere principala": "plângerea principală, motivul consultației",
+        "istoricul prezent": "istoricul bolii prezente",
+        "istoric medical trecut": "istoricul medical anterior (boli, intervenții chirurgicale, spitalizări)",
+        "medicamente": "medicamentele curente și dozajele",
+        "alergii": "alergiile cunoscute (medicamente, alimente, mediu)",
+        "istoric familial": "istoricul medical familial relevant",
+        "istoric social": "istoricul social (fumat, alcool, ocupație, factori de stil de viață)",
+        "semne vitale": "semnele vitale măsurate",
+        "examinare fizica": "găsirile examinării fizice",
+        "evaluare": "impresia clinică și diagnosticul de lucru",
+        "plan": "teste diagnostice, medicamente, instrucțiuni de urmărire",
+        "urmarire": "când să revină, semne de alarmă de urmărit, modificări de stil de viață"
+    }
+}
@@ -0,0 +1,66 @@
+import os
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# One client per upstream host, so the httpx pool limits act as per-host limits.
+_llm_router_client = None
+_whisper_hosted_client = None
+
+
+def _http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2
+    except ImportError:
+        return False
+    return True
+
+
+def _client_options() -> dict:
+    return {
+        "http2": _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+    }
+
+
+def get_llm_router_client() -> httpx.AsyncClient:
+    global _llm_router_client
+    if _llm_router_client is None or _llm_router_client.is_closed:
+        _llm_router_client = httpx.AsyncClient(**_client_options())
+    return _llm_router_client
+
+
+def get_whisper_hosted_client() -> httpx.Client:
+    # Used from the transcription thread pool, hence the sync client.
+    global _whisper_hosted_client
+    if _whisper_hosted_client is None or _whisper_hosted_client.is_closed:
+        _whisper_hosted_client = httpx.Client(**_client_options())
+    return _whisper_hosted_client
+
+
+def open_http_clients():
+    get_llm_router_client()
+    get_whisper_hosted_client()
+    print(f"HTTP clients ready (http2: {_http2_available()}, max connections per host: {HTTP_MAX_CONNECTIONS_PER_HOST})")
+
+
+async def close_http_clients():
+    global _llm_router_client, _whisper_hosted_client
+    if _llm_router_client is not None:
+        await _llm_router_client.aclose()
+        _llm_router_client = None
+    if _whisper_hosted_client is not None:
+        _whisper_hosted_client.close()
+        _whisper_hosted_client = None
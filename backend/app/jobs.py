@@ -0,0 +1,163 @@
+import os
+import time
+import uuid
+import asyncio
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+JOB_QUEUE_MAX_SIZE = int(os.getenv("JOB_QUEUE_MAX_SIZE", "100"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "8"))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.stage = None
+        self.stage_timings = {}
+        self.result = None
+        self.partial_fields = {}
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    @contextmanager
+    def track_stage(self, name: str):
+        self.stage = name
+        self._notify()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[name] = round(time.perf_counter() - started, 3)
+
+    async def set_partial_field(self, field: str, value: str):
+        self.partial_fields[field] = value
+        self._notify()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "stage_timings": self.stage_timings,
+            "queued_seconds": round((self.started_at or time.time()) - self.created_at, 3),
+            "partial_fields": self.partial_fields,
+            "result": self.result,
+            "error": self.error
+        }
+
+    async def watch(self):
+        while True:
+            changed = self._changed
+            yield self.to_dict()
+            if self.status in TERMINAL_STATUSES:
+                return
+            await changed.wait()
+
+
+# In-process queue: a bounded asyncio.Queue drained by a fixed set of worker
+# tasks. submit() refuses work instead of growing the backlog without limit.
+class JobQueue:
+    def __init__(self, max_size: int = JOB_QUEUE_MAX_SIZE, workers: int = JOB_WORKERS,
+                 result_ttl_seconds: float = JOB_RESULT_TTL_SECONDS):
+        self.max_size = max_size
+        self.workers = workers
+        self.result_ttl_seconds = result_ttl_seconds
+        self._queue = None
+        self._worker_tasks = []
+        self._jobs = {}
+        self._running = 0
+        self._stage_totals = {}
+        self._stage_counts = {}
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def submit(self, fn, *args, **kwargs) -> Job:
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        self._purge_expired()
+        job = Job()
+        try:
+            self._queue.put_nowait((job, fn, args, kwargs))
+        except asyncio.QueueFull:
+            raise QueueFullError("Processing queue is full, retry later")
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job, fn, args, kwargs = await self._queue.get()
+            self._running += 1
+            job.status = "running"
+            job.started_at = time.time()
+            job._notify()
+            try:
+                job.result = await fn(job, *args, **kwargs)
+                job.status = "completed"
+            except Exception as e:
+                job.error = str(e) or type(e).__name__
+                job.status = "failed"
+            finally:
+                job.finished_at = time.time()
+                job.stage = None
+                self._running -= 1
+                self._record_timings(job)
+                job._notify()
+                self._queue.task_done()
+
+    def _record_timings(self, job: Job):
+        for stage, seconds in job.stage_timings.items():
+            self._stage_totals[stage] = self._stage_totals.get(stage, 0.0) + seconds
+            self._stage_counts[stage] = self._stage_counts.get(stage, 0) + 1
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.result_ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        statuses = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_size,
+            "workers": self.workers,
+            "running": self._running,
+            "jobs": statuses,
+            "average_stage_seconds": {
+                stage: round(total / self._stage_counts[stage], 3)
+                for stage, total in self._stage_totals.items()
+            }
+        }
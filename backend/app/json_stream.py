@@ -0,0 +1,184 @@
+import json
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_TERMINATORS = ",}]" + _WHITESPACE
+
+
+# Tolerant parser for the top-level JSON object in LLM output. Text can be fed
+# in arbitrary pieces (e.g. streamed tokens); every key/value pair is reported
+# as soon as it is complete, and noise around or inside the object is skipped.
+class IncrementalJSONParser:
+    def __init__(self):
+        self.values = {}
+        self.started = False
+        self.complete = False
+        self._buffer = ""
+        self._position = 0
+        self._state = "seek"
+        self._key = None
+
+    def feed(self, text: str) -> list:
+        self._buffer += text
+        pairs = []
+        while not self.complete and self._step(pairs):
+            pass
+        return pairs
+
+    def _skip(self, characters: str) -> bool:
+        while self._position < len(self._buffer) and self._buffer[self._position] in characters:
+            self._position += 1
+        return self._position < len(self._buffer)
+
+    def _consume(self):
+        self._buffer = self._buffer[self._position:]
+        self._position = 0
+
+    def _step(self, pairs: list) -> bool:
+        if self._state == "seek":
+            start = self._buffer.find("{", self._position)
+            if start < 0:
+                self._buffer = ""
+                self._position = 0
+                return False
+            self._position = start + 1
+            self.started = True
+            self._state = "key"
+            self._consume()
+            return True
+
+        if self._state == "key":
+            if not self._skip(_WHITESPACE + ","):
+                return False
+            character = self._buffer[self._position]
+            if character == "}":
+                self._position += 1
+                self.complete = True
+                return False
+            if character != '"':
+                self._position += 1
+                return True
+            end = self._string_end(self._position)
+            if end is None:
+                return False
+            self._key = self._decode(self._buffer[self._position:end])
+            self._position = end
+            self._state = "colon"
+            return True
+
+        if self._state == "colon":
+            if not self._skip(_WHITESPACE):
+                return False
+            if self._buffer[self._position] == ":":
+                self._position += 1
+            self._state = "value"
+            return True
+
+        if self._state == "value":
+            if not self._skip(_WHITESPACE):
+                return False
+            start = self._position
+            character = self._buffer[start]
+            if character == '"':
+                end = self._string_end(start)
+            elif character in "{[":
+                end = self._container_end(start)
+            else:
+                end = self._scalar_end(start)
+            if end is None:
+                return False
+            value = self._decode(self._buffer[start:end])
+            if isinstance(self._key, str):
+                self.values[self._key] = value
+                pairs.append((self._key, value))
+            self._key = None
+            self._position = end
+            self._state = "after"
+            self._consume()
+            return True
+
+        if self._state == "after":
+            if not self._skip(_WHITESPACE):
+                return False
+            character = self._buffer[self._position]
+            if character == "}":
+                self._position += 1
+                self.complete = True
+                return False
+            if character == ",":
+                self._position += 1
+            self._state = "key"
+            return True
+
+        return False
+
+    def _string_end(self, start: int):
+        index = start + 1
+        while True:
+            index = self._buffer.find('"', index)
+            if index < 0:
+                return None
+            backslashes = 0
+            while self._buffer[index - 1 - backslashes] == "\\":
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return index + 1
+            index += 1
+
+    def _container_end(self, start: int):
+        depth = 0
+        index = start
+        while index < len(self._buffer):
+            character = self._buffer[index]
+            if character == '"':
+                end = self._string_end(index)
+                if end is None:
+                    return None
+                index = end
+                continue
+            if character in "{[":
+                depth += 1
+            elif character in "}]":
+                depth -= 1
+                if depth == 0:
+                    return index + 1
+            index += 1
+        return None
+
+    def _scalar_end(self, start: int):
+        # A bare number or literal is only complete once a terminator follows;
+        # "12" at the end of a truncated stream may still become "125".
+        for index in range(start, len(self._buffer)):
+            if self._buffer[index] in _SCALAR_TERMINATORS:
+                return index
+        return None
+
+    @staticmethod
+    def _decode(raw: str):
+        try:
+            return json.loads(raw, strict=False)
+        except ValueError:
+            text = raw.strip()
+            if len(text) >= 2 and text[0] == text[-1] == '"':
+                text = text[1:-1]
+            return text
+
+
+def parse_json_object(text: str):
+    if not text:
+        return None, False
+    # Well-formed output, possibly wrapped in prose or a code fence, is left to
+    # the C decoder; the incremental parser only handles what it rejects.
+    start = text.find("{")
+    end = text.rfind("}")
+    if 0 <= start < end:
+        try:
+            value = json.loads(text[start:end + 1])
+            if isinstance(value, dict):
+                return value, True
+        except ValueError:
+            pass
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    if not parser.started:
+        return None, False
+    return parser.values, parser.complete
@@ -0,0 +1,150 @@
+import os
+import re
+from functools import lru_cache
+from rapidfuzz import fuzz, process
+from app.form_schemas import FORM_SCHEMAS
+from app.segmenter import label_variants, normalize_for_matching
+
+# fuzz.ratio score (0-100). At 88 a single typo is tolerated from nine
+# characters on, so short labels such as "AS" or "VD" only match exactly.
+LABEL_MATCH_SCORE_CUTOFF = float(os.getenv("LABEL_MATCH_SCORE_CUTOFF", "88"))
+
+# A fuzzy hit must agree with the label on the first characters of every
+# word; mis-transcriptions rarely touch the start of a word, while different
+# anatomy often differs only there ("descendenta" / "ascendenta").
+LABEL_MATCH_STEM_CHARS = int(os.getenv("LABEL_MATCH_STEM_CHARS", "2"))
+
+# Words that name another structure than the label word they resemble; a
+# transcript word starting with one of them never matches that label word.
+CONTRASTING_LABEL_WORDS = {
+    "ascendenta": ("descendent",),
+    "stang": ("drept", "dreapt"),
+    "drept": ("stang",),
+    "atriu": ("ventricul",),
+    "atriul": ("ventricul",),
+    "ventricul": ("atri",),
+    "ventriculul": ("atri",),
+}
+
+_WORD_REGEX = re.compile(r"\w+")
+
+
+def is_label_misspelling(query: str, variant: str) -> bool:
+    for query_word, variant_word in zip(query.split(), variant.split()):
+        if query_word == variant_word:
+            continue
+        if query_word[:LABEL_MATCH_STEM_CHARS] != variant_word[:LABEL_MATCH_STEM_CHARS]:
+            return False
+        if query_word.startswith(CONTRASTING_LABEL_WORDS.get(variant_word, ())):
+            return False
+    return True
+
+
+def fuzzy_label_variants(field_name: str) -> set:
+    variants = label_variants(field_name)
+    words = normalize_for_matching(field_name).split()
+    dearticulated = []
+    for word in words:
+        if word.endswith("ului") and len(word) > 7:
+            word = word[:-4]
+        elif word.endswith("ul") and len(word) > 5:
+            word = word[:-2]
+        dearticulated.append(word)
+    if dearticulated:
+        variants.add(" ".join(dearticulated))
+    return variants
+
+
+@lru_cache(maxsize=1024)
+def label_prefix_variants(field_name: str) -> tuple:
+    variants = fuzzy_label_variants(field_name)
+    words = normalize_for_matching(field_name).split()
+    if len(words) > 1:
+        variants.add(words[-1])
+    return tuple(sorted(variants, key=len, reverse=True))
+
+
+def strip_prefix_variants(value: str, variants: tuple) -> str:
+    normalized = normalize_for_matching(value)
+    for variant in variants:
+        if not normalized.startswith(variant):
+            continue
+        if len(normalized) > len(variant) and normalized[len(variant)].isalnum():
+            continue
+        remaining = value[len(variant):].strip()
+        if remaining.startswith(','):
+            remaining = remaining[1:].strip()
+        if remaining.startswith(':'):
+            remaining = remaining[1:].strip()
+        return remaining
+    return value
+
+
+def merge_labels(labels: list, extra_labels: list) -> list:
+    merged = list(labels)
+    for label in extra_labels:
+        if any(label[1] < end and start < label[2] for _, start, end in merged):
+            continue
+        merged.append(label)
+    return sorted(merged, key=lambda label: label[1])
+
+
+# Every variant of every field is grouped by word count, so each transcript
+# n-gram is scored against all same-length variants in one cdist call.
+class FuzzyLabelIndex:
+    def __init__(self, field_names, score_cutoff: float = LABEL_MATCH_SCORE_CUTOFF):
+        self.field_names = tuple(field_names)
+        self.score_cutoff = score_cutoff
+        self._groups = {}
+        for field in self.field_names:
+            for variant in sorted(fuzzy_label_variants(field)):
+                variants, fields = self._groups.setdefault(len(variant.split()), ([], []))
+                variants.append(variant)
+                fields.append(field)
+
+    def find_labels(self, transcript: str, fields=None) -> list:
+        normalized = normalize_for_matching(transcript)
+        words = [(match.start(), match.end()) for match in _WORD_REGEX.finditer(normalized)]
+        wanted = set(fields) if fields is not None else None
+
+        candidates = []
+        for size, (variants, variant_fields) in self._groups.items():
+            if wanted is not None:
+                columns = [index for index, field in enumerate(variant_fields) if field in wanted]
+                if not columns:
+                    continue
+                variants = [variants[index] for index in columns]
+                variant_fields = [variant_fields[index] for index in columns]
+            ngrams = [
+                (words[index][0], words[index + size - 1][1])
+                for index in range(len(words) - size + 1)
+            ]
+            if not ngrams:
+                continue
+            queries = [" ".join(normalized[start:end].split()) for start, end in ngrams]
+            scores = process.cdist(queries, variants, scorer=fuzz.ratio, score_cutoff=self.score_cutoff)
+            for row in scores.any(axis=1).nonzero()[0]:
+                columns = sorted(scores[row].nonzero()[0], key=lambda column: -scores[row, column])
+                column = next((column for column in columns if is_label_misspelling(queries[row], variants[column])), None)
+                if column is not None:
+                    start, end = ngrams[row]
+                    candidates.append((float(scores[row, column]), end - start, variant_fields[column], start, end))
+
+        # Highest score first, longer spans break ties; overlapping weaker
+        # candidates are dropped.
+        labels = []
+        for score, _, field, start, end in sorted(candidates, key=lambda item: (-item[0], -item[1], item[3])):
+            if any(start < label_end and label_start < end for _, label_start, label_end in labels):
+                continue
+            labels.append((field, start, end))
+        return sorted(labels, key=lambda label: label[1])
+
+
+LABEL_INDEXES = {form_type: FuzzyLabelIndex(schema) for form_type, schema in FORM_SCHEMAS.items()}
+
+
+def get_label_index(form_type: str) -> FuzzyLabelIndex:
+    index = LABEL_INDEXES.get(form_type)
+    if index is None:
+        index = FuzzyLabelIndex(())
+    return index
@@ -0,0 +1,139 @@
+import os
+import re
+from app.form_schemas import FORM_SCHEMAS
+from app.segmenter import get_segmenter, normalize_for_matching
+from app.label_index import get_label_index, merge_labels
+
+LOCAL_EXTRACTION_FORM_TYPES = ("echocardiography",)
+# Opt-in: a field whose label the local matchers cannot find is left empty
+# instead of being sent to the LLM, which also understands label variants
+# the matchers miss.
+LOCAL_EXTRACTION_TRUST_ABSENT = os.getenv("LOCAL_EXTRACTION_TRUST_ABSENT", "false").lower() in ("1", "true", "yes")
+
+UNIT_WORDS = {
+    'zero': 0, 'unu': 1, 'una': 1, 'doi': 2, 'doua': 2,
+    'trei': 3, 'patru': 4, 'cinci': 5, 'sase': 6,
+    'sapte': 7, 'opt': 8, 'noua': 9
+}
+TEEN_WORDS = {
+    'zece': 10, 'unsprezece': 11, 'doisprezece': 12, 'douasprezece': 12, 'treisprezece': 13,
+    'paisprezece': 14, 'cincisprezece': 15, 'saisprezece': 16,
+    'saptesprezece': 17, 'optsprezece': 18, 'nouasprezece': 19
+}
+TENS_WORDS = {
+    'douazeci': 20, 'treizeci': 30, 'patruzeci': 40, 'cincizeci': 50,
+    'saizeci': 60, 'saptezeci': 70, 'optzeci': 80, 'nouazeci': 90
+}
+UNITS = ('milimetri', 'centimetri', 'metri', 'mm', 'cm', 'm')
+
+
+def _alternation(words) -> str:
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+_UNIT_PATTERN = _alternation(UNITS)
+_NUMBER_WORD_PATTERN = (
+    rf"(?P<tens>{_alternation(TENS_WORDS)})(?:\s+si\s+(?P<tens_unit>{_alternation(UNIT_WORDS)}))?"
+    rf"|(?P<teen>{_alternation(TEEN_WORDS)})"
+    rf"|(?P<unit_word>{_alternation(UNIT_WORDS)})"
+)
+# Matched against diacritic-folded lowercase text; every number in a span is
+# found in one pass and the best candidate is picked afterwards.
+MEASUREMENT_REGEX = re.compile(
+    rf"(?<![\w.,])(?:(?P<digits>\d+(?:[.,]\d+)?)(?![\d.,]\d)|(?:{_NUMBER_WORD_PATTERN})(?!\w))"
+    rf"(?:\s*(?P<measure_unit>{_UNIT_PATTERN})(?!\w))?"
+)
+_UNIT_AFTER_REGEX = re.compile(rf"(?<!\w)(?:{_UNIT_PATTERN})(?!\w)")
+_UNIT_MAX_LENGTH = max(len(unit) for unit in UNITS)
+
+
+def _number_word_value(match) -> int:
+    if match.group("tens"):
+        value = TENS_WORDS[match.group("tens")]
+        if match.group("tens_unit"):
+            value += UNIT_WORDS[match.group("tens_unit")]
+        return value
+    if match.group("teen"):
+        return TEEN_WORDS[match.group("teen")]
+    return UNIT_WORDS[match.group("unit_word")]
+
+
+def parse_measurement(text: str) -> str:
+    search_text = text.strip()
+    offset = len(text) - len(text.lstrip())
+    normalized = normalize_for_matching(text)[offset:offset + len(search_text)]
+
+    # Priority mirrors dictation habits: a number with its unit wins over a
+    # bare number, and digits win over spelled-out numbers.
+    best = None
+    for match in MEASUREMENT_REGEX.finditer(normalized):
+        is_digits = match.group("digits") is not None
+        has_unit = match.group("measure_unit") is not None
+        unit_match = None
+        if not has_unit:
+            # A unit must start inside the window but is matched against the
+            # text beyond it, so "mai" cut to "m" is not read as metres.
+            window_end = match.end() + (10 if is_digits else 15)
+            unit_match = _UNIT_AFTER_REGEX.search(normalized, match.end(), window_end + _UNIT_MAX_LENGTH + 1)
+            if unit_match is not None and unit_match.start() >= window_end:
+                unit_match = None
+            if unit_match is None and match.start() >= 30:
+                continue
+
+        rank = (0 if has_unit or unit_match else 1, 0 if is_digits else 1)
+        if best is not None and rank >= best[0]:
+            continue
+
+        if is_digits:
+            number = search_text[match.start("digits"):match.end("digits")]
+        else:
+            number = str(_number_word_value(match))
+
+        if has_unit:
+            unit = search_text[match.start("measure_unit"):match.end("measure_unit")]
+        elif unit_match:
+            unit = search_text[unit_match.start():unit_match.end()]
+        else:
+            unit = ""
+
+        best = (rank, f"{number} {unit}" if unit else number)
+        if rank == (0, 0):
+            break
+
+    return best[1] if best else ""
+
+
+def extract_fields_locally(form_type: str, transcript: str, target_fields: list):
+    schema = FORM_SCHEMAS.get(form_type, {})
+    segmenter = get_segmenter(tuple(schema))
+    labels = segmenter.find_labels(transcript)
+    found_fields = {label[0] for label in labels}
+    missing_fields = [field for field in target_fields if field in schema and field not in found_fields]
+    if missing_fields:
+        # Exact matching misses misspelled or mis-transcribed headers; only
+        # those fields go through the fuzzy index.
+        labels = merge_labels(labels, get_label_index(form_type).find_labels(transcript, missing_fields))
+    spans = segmenter.first_spans(transcript, labels)
+
+    values = {}
+    unresolved = []
+    for field in target_fields:
+        if field not in schema:
+            unresolved.append(field)
+            continue
+
+        span = spans.get(field)
+        if span is None:
+            if LOCAL_EXTRACTION_TRUST_ABSENT:
+                values[field] = ""
+            else:
+                unresolved.append(field)
+            continue
+
+        value = parse_measurement(transcript[span.value_start:span.value_end])
+        if value:
+            values[field] = value
+        else:
+            unresolved.append(field)
+
+    return values, unresolved
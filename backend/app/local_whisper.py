@@ -0,0 +1,56 @@
+import os
+import io
+import threading
+import numpy as np
+from dotenv import load_dotenv
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+load_dotenv()
+
+LOCAL_WHISPER_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "small")
+LOCAL_WHISPER_COMPUTE_TYPE = os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+LOCAL_WHISPER_THREADS_PER_WORKER = int(os.getenv("LOCAL_WHISPER_THREADS_PER_WORKER", "4"))
+# 0 sizes the pool from the core count: one worker per LOCAL_WHISPER_THREADS_PER_WORKER cores.
+LOCAL_WHISPER_WORKERS = int(os.getenv("LOCAL_WHISPER_WORKERS", "0"))
+LOCAL_WHISPER_BEAM_SIZE = int(os.getenv("LOCAL_WHISPER_BEAM_SIZE", "1"))
+LOCAL_WHISPER_DOWNLOAD_DIR = os.getenv("LOCAL_WHISPER_DOWNLOAD_DIR") or None
+
+
+def default_worker_count(threads_per_worker: int = LOCAL_WHISPER_THREADS_PER_WORKER) -> int:
+    return max(1, (os.cpu_count() or 1) // max(1, threads_per_worker))
+
+
+# One CTranslate2 model whose weights are shared by `workers` inference
+# workers, so N recordings decode in parallel without N copies of the model.
+# The semaphore keeps callers from oversubscribing the cores.
+class LocalWhisperPool:
+    def __init__(self, model_name: str = LOCAL_WHISPER_MODEL, compute_type: str = LOCAL_WHISPER_COMPUTE_TYPE,
+                 workers: int = LOCAL_WHISPER_WORKERS, threads_per_worker: int = LOCAL_WHISPER_THREADS_PER_WORKER):
+        if WhisperModel is None:
+            raise RuntimeError("faster-whisper is not installed")
+        self.model_name = model_name
+        self.workers = workers if workers > 0 else default_worker_count(threads_per_worker)
+        self.threads_per_worker = max(1, threads_per_worker)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._model = WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=self.threads_per_worker,
+            num_workers=self.workers,
+            download_root=LOCAL_WHISPER_DOWNLOAD_DIR
+        )
+        # Warm-up so the first real request does not pay for lazy initialisation.
+        self.transcribe(np.zeros(16000, dtype=np.float32), "ro")
+        print(f"Local Whisper ready: {model_name} ({compute_type}, {self.workers} workers x {self.threads_per_worker} threads)")
+
+    def transcribe(self, audio, language: str = "ro") -> str:
+        if isinstance(audio, (bytes, bytearray)):
+            audio = io.BytesIO(audio)
+        with self._slots:
+            segments, _ = self._model.transcribe(audio, language=language, beam_size=LOCAL_WHISPER_BEAM_SIZE)
+            return " ".join(segment.text.strip() for segment in segments).strip()
@@ -1,112 +1,50 @@
 import os
 import json
-import re
-import httpx
 import base64
+import time
+from typing import List
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 from deepgram import DeepgramClient
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from app.routers import patients, new_patient_forms, medical_reports, consultation_forms, prescription_forms, echocardiography_forms, auth
 from app.database import check_and_init_db
-from app.transcription import transcribe_audio
+from app.transcription import transcribe_audio_async, transcript_cache, preload_provider_clients
+from app.http_clients import open_http_clients, close_http_clients
+from app.pagination import NEXT_CURSOR_HEADER
+from app.document_cache import document_cache
+from app.streaming import StreamingExtractionSession, create_streaming_transcriber
+from app.audio_upload import UploadTooLargeError, spool_upload
+from app.jobs import JobQueue, QueueFullError
+from app.batch import BATCH_MAX_FILES, batch_limiter, stream_as_completed
+from app.local_extraction import LOCAL_EXTRACTION_FORM_TYPES, extract_fields_locally
+from app.extraction import extraction_cache, parse_transcript_with_llm
+from app.extraction_backends import start_extraction_backend, stop_extraction_backend
+from app.console import safe_encode_str, safe_print
+from app.vad import time_map_to_dicts
 
 load_dotenv()
 
 HF_TOKEN = os.getenv("HF_TOKEN", "")
 DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY", "")
 
-MODEL_ID = "google/gemma-2-2b-it"
-SYSTEM_PROMPT = (
-    "Sunteți un asistent expert în extragerea informațiilor din text medical transcrit. "
-    "Analizați cu atenție textul și extrageți informațiile solicitate de utilizator. "
-    "Răspunsul trebuie să fie STRICT un JSON valid care respectă schema furnizată. "
-    "Nu includeți niciun text suplimentar, explicații sau caractere înainte sau după JSON. "
-    "IMPORTANT: Toate valorile trebuie să fie STRING-uri simple, NU liste, NU array-uri, NU obiecte. "
-    "Dacă există multiple informații pentru un câmp, combinați-le într-un singur string, separând cu virgulă sau punct. "
-    "CRITICAL: Când extrageți valoarea pentru un câmp, NU includeți numele câmpului în valoarea extrasă. "
-    "Extrageți DOAR textul care apare DUPĂ numele câmpului, fără a include numele câmpului însuși. "
-    "De exemplu, dacă textul spune 'Diagnostic, are probleme cu inima', extrageți DOAR 'are probleme cu inima', NU 'Diagnostic, are probleme cu inima'. "
-    "Când căutați informații pentru un câmp, căutați variații ale numelui câmpului în text (ignorați diferențe de majuscule/minuscule și variații de formulare). "
-    "Exemple de variații acceptate: 'istoricul prezent' = 'istoric bolii prezente' = 'istoricul bolii prezente' = 'istoric prezent'. "
-    "Exemple de variații acceptate: 'examinare fizica' = 'examinare fizică' = 'examinare fizica,'. "
-    "Dacă un câmp apare în text urmat de virgulă sau două puncte, extrageți tot textul care urmează până la următorul câmp sau până la sfârșitul propoziției. "
-    "Extrageți EXACT textul care apare după numele câmpului (fără numele câmpului), chiar dacă pare neclar sau conține erori. "
-    "Valorile extrase trebuie să includă întotdeauna unitatea de măsură când este relevant (de exemplu, '10 milimetri', '40kg', '9cm', '2 bete', '3 paduri'). "
-    "Dacă nu se găsesc informații pentru o cheie, utilizați exact valoarea 'null'. "
-    "Adauga unitatile de masura utilizate in Romania pentru fiecare dimensiune extrasa. Exemplu: '10 milimetri', '20 centimetri', '30 metri', '40 mm', '50 cm', '60 m', '40kg'. "
-    "Exemplu corect: {\"simptome\": \"tuse seacă, durere în gât, febră ușoară\"} - NU {\"simptome\": [\"tuse seacă\", \"durere în gât\"]}"
-)
-
-FORM_SCHEMAS = {
-    "echocardiography": {
-        "aorta la inel": "dimensiunea in mm a aortei la inel",
-        "aorta la sinusur levart sagva": "dimensiunea in mm a aortei la sinusur levart sagva",
-        "aorta ascendenta": "dimensiunea in mm a aortei ascendente",
-        "ventricul drept": "dimensiunea in mm a ventriculului drept",
-        "atriu stang": "dimensiunea in mm a atriului stang",
-        "as": "dimensiunea in mm a atriului stang (prescurtat)",
-        "vd": "dimensiunea in mm a ventriculului drept (prescurtat)"
-    },
-    "medical-report": {
-        "plangere principala": "plângerea principală a pacientului, motivul principal pentru consultație",
-        "istoricul prezent": "istoricul bolii prezente, descrierea detaliată a simptomelor și evoluției",
-        "examinare fizica": "rezultatele examinării fizice, observațiile clinice",
-        "diagnostic": "diagnosticul medical stabilit",
-        "tratament": "planul de tratament recomandat",
-        "recomandari": "recomandări pentru urmărire și monitorizare"
-    },
-    "consultation-form": {
-        "simptome": "simptomele prezente și plângerile pacientului",
-        "semne vitale": "semnele vitale măsurate (tensiune arterială, temperatură, puls, etc.)",
-        "evaluare": "evaluarea clinică și concluziile medicale",
-        "plan": "planul de tratament și urmărire"
-    },
-    "prescription-form": {
-        "medicamente": "numele medicamentelor prescrise",
-        "dozaj": "dozajul și frecvența de administrare",
-        "instructiuni": "instrucțiuni speciale și avertismente",
-        "urmarire": "instrucțiuni pentru urmărire și control"
-    },
-    "first-time-new-patient": {
-        "nume pacient": "numele complet al pacientului",
-        "data nasterii": "data nașterii pacientului",
-        "gen": "genul pacientului",
-        "informatii contact": "informații de contact (telefon, email, contact de urgență)",
-        "plangere principala": "plângerea principală, motivul consultației",
-        "istoricul prezent": "istoricul bolii prezente",
-        "istoric medical trecut": "istoricul medical anterior (boli, intervenții chirurgicale, spitalizări)",
-        "medicamente": "medicamentele curente și dozajele",
-        "alergii": "alergiile cunoscute (medicamente, alimente, mediu)",
-        "istoric familial": "istoricul medical familial relevant",
-        "istoric social": "istoricul social (fumat, alcool, ocupație, factori de stil de viață)",
-        "semne vitale": "semnele vitale măsurate",
-        "examinare fizica": "găsirile examinării fizice",
-        "evaluare": "impresia clinică și diagnosticul de lucru",
-        "plan": "teste diagnostice, medicamente, instrucțiuni de urmărire",
-        "urmarire": "când să revină, semne de alarmă de urmărit, modificări de stil de viață"
-    }
-}
-
 class ParsedRecordingResponse(BaseModel):
     raw_transcript: str
     parsed_json: dict
+    # Present when VAD trimmed silence before transcription; maps positions in
+    # the trimmed audio back to the original recording.
+    time_map: list[dict] | None = None
 
-def safe_encode_str(s):
-    try:
-        if isinstance(s, bytes):
-            s = s.decode('utf-8', errors='replace')
-        return str(s).encode('ascii', 'replace').decode('ascii')
-    except:
-        return repr(s)
 
-def safe_print(msg):
-    try:
-        safe_msg = safe_encode_str(msg)
-        print(safe_msg)
-    except:
-        print(repr(msg))
+class ParseTranscriptRequest(BaseModel):
+    transcript: str
+    fields: list[str]
+    form_type: str | None = None
+
 
 if not HF_TOKEN:
     safe_print("WARNING: HF_TOKEN is not set! Check your .env file or environment variables.")
@@ -154,179 +92,127 @@ def extract_exception_info(exc):
     
     return exc_type, msg
 
-def extract_value_after_field(transcript: str, field_end_pos: int, all_field_names: list) -> str:
-    number_words = {
-        'zero': '0', 'unu': '1', 'una': '1', 'doi': '2', 'două': '2',
-        'trei': '3', 'patru': '4', 'cinci': '5', 'șase': '6', 'sase': '6',
-        'șapte': '7', 'sapte': '7', 'opt': '8', 'nouă': '9', 'noua': '9',
-        'zece': '10', 'unsprezece': '11', 'doisprezece': '12', 'treisprezece': '13',
-        'paisprezece': '14', 'cincisprezece': '15', 'șaisprezece': '16',
-        'șaptesprezece': '17', 'optsprezece': '18', 'nouăsprezece': '19', 'nouasprezece': '19',
-        'douăzeci': '20', 'douazeci': '20'
-    }
-    
-    units = ['milimetri', 'centimetri', 'metri', 'mm', 'cm', 'm']
-    
-    remaining_text = transcript[field_end_pos:].strip()
-    remaining_lower = remaining_text.lower()
+async def parse_transcript(raw_transcript: str, target_fields: list, form_type: str = None, on_field=None,
+                           use_cache: bool = True) -> dict:
+    if form_type not in LOCAL_EXTRACTION_FORM_TYPES:
+        return await parse_transcript_with_llm(raw_transcript, target_fields, form_type, on_field, use_cache)
     
-    next_field_pos = len(remaining_text)
-    normalized_all_fields = [f.lower() for f in all_field_names]
+    local_values, unresolved_fields = extract_fields_locally(form_type, raw_transcript, target_fields)
+    safe_print(f"Local extraction resolved {len(local_values)}/{len(target_fields)} fields")
+    if on_field is not None:
+        for field, value in local_values.items():
+            await on_field(field, value)
     
-    for field_name in normalized_all_fields:
-        field_pos = remaining_lower.find(field_name)
-        if field_pos != -1 and field_pos < next_field_pos:
-            next_field_pos = field_pos
+    if unresolved_fields:
+        llm_values = await parse_transcript_with_llm(raw_transcript, unresolved_fields, form_type, on_field, use_cache)
+        local_values.update(llm_values)
     
-    search_text = remaining_text[:next_field_pos].strip()
-    search_lower = search_text.lower()
-    
-    pattern1 = r'(\d+(?:[.,]\d+)?)\s*(milimetri|centimetri|metri|mm|cm|m)\b'
-    match1 = re.search(pattern1, search_lower, re.IGNORECASE)
-    if match1:
-        original_match = re.search(pattern1, search_text, re.IGNORECASE)
-        if original_match:
-            value = original_match.group(0).strip()
-            parts = value.split()
-            if len(parts) >= 2:
-                if parts[1].lower() in units or parts[1].lower().replace('mm', '').replace('cm', '').replace('m', '') == '':
-                    return f"{parts[0]} {parts[1]}"
-            return value
-    
-    for word, digit in number_words.items():
-        pattern2 = rf'\b{re.escape(word)}\s+(milimetri|centimetri|metri|mm|cm|m)\b'
-        match2 = re.search(pattern2, search_lower)
-        if match2:
-            original_match = re.search(pattern2, search_text, re.IGNORECASE)
-            if original_match:
-                value = original_match.group(0).strip()
-                parts = value.split()
-                if len(parts) >= 2 and parts[0].lower() in number_words:
-                    return f"{number_words[parts[0].lower()]} {parts[1]}"
-                return value
-    
-    pattern3 = r'\b(\d+(?:[.,]\d+)?)\b'
-    match3 = re.search(pattern3, search_lower)
-    if match3:
-        original_match = re.search(pattern3, search_text, re.IGNORECASE)
-        if original_match:
-            num = original_match.group(1)
-            num_start = original_match.start()
-            
-            after_num_text = search_text[original_match.end():original_match.end()+10].strip()
-            unit_match = re.search(r'\b(milimetri|centimetri|metri|mm|cm|m)\b', after_num_text, re.IGNORECASE)
+    return {field: local_values.get(field, "") for field in target_fields}
+
+
+def parse_fields_json(fields_json: str) -> list:
+    try:
+        fields_data = json.loads(fields_json)
+        target_fields = fields_data.get("fields", [])
+        
+        if not target_fields or not isinstance(target_fields, list):
+            raise HTTPException(
+                status_code=400, 
+                detail="Invalid 'fields' array provided in JSON string."
+            )
             
-            if unit_match:
-                return f"{num} {unit_match.group(0)}"
-            else:
-                if num_start < 30:
-                    return num
-    
-    first_part = search_lower[:30] if len(search_lower) > 30 else search_lower
-    for word, digit in number_words.items():
-        pattern4 = rf'\b{re.escape(word)}\b'
-        match4 = re.search(pattern4, first_part)
-        if match4:
-            word_end_in_full = match4.end()
-            after_word = search_lower[word_end_in_full:word_end_in_full+15].strip()
-            unit_match = re.search(r'\b(milimetri|centimetri|metri|mm|cm|m)\b', after_word)
-            if unit_match:
-                return f"{digit} {unit_match.group(0)}"
-            else:
-                return digit
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=400,
+            detail="The 'fields_json' parameter must be a valid JSON string."
+        )
     
-    return ""
+    return target_fields
+
 
-def extract_strict_json(response_text):
-    if not response_text:
-        return None
+async def run_recording_job(job, audio_content, target_fields, form_type, transcription_provider):
     try:
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        match = re.search(r"\{.*\}", response_text, re.DOTALL)
-        if match:
-            try:
-                return json.loads(match.group())
-            except json.JSONDecodeError:
-                return None
-        else:
-            return None
+        with job.track_stage("transcription"):
+            transcription_response = await transcribe_audio_async(
+                audio_content=audio_content,
+                provider=transcription_provider,
+                language="ro"
+            )
+        raw_transcript = transcription_response.text
+        safe_print(f"Job {job.id}: transcription successful, length: {len(raw_transcript)} chars")
+        
+        with job.track_stage("extraction"):
+            parsed_json = await parse_transcript(raw_transcript, target_fields, form_type, job.set_partial_field)
+        
+        return ParsedRecordingResponse(
+            raw_transcript=raw_transcript,
+            parsed_json=parsed_json,
+            time_map=time_map_to_dicts(transcription_response.time_map)
+        ).model_dump()
+    finally:
+        audio_content.close()
 
-def extract_data_with_api(model_id, text_to_analyze, form_schema, hf_token):
-    api_key_to_use = HF_TOKEN
-    
-    if not api_key_to_use:
-        print("ERROR: Hugging Face Token (hf_token) is missing or not set in environment variables.")
-        return "Extraction failed: Missing API Key."
-    
-    user_content = (
-        f"""
-Vă rugăm să extrageți informațiile din textul următor pe baza schemei JSON furnizate.
-
-TEXT TRANSCRIS:
-"{text_to_analyze}"
-
-SCHEMA JSON (cheile sunt numele câmpurilor, valorile sunt descrieri):
-{form_schema}
-
-INSTRUCȚIUNI CRITICE:
-1. Căutați în text variații ale numelor câmpurilor (ignorați diferențe de majuscule/minuscule și variații de formulare)
-   - Exemple: "istoricul prezent" = "istoric bolii prezente" = "istoricul bolii prezente" = "istoric prezent"
-   - Exemple: "examinare fizica" = "examinare fizică" = "examinare fizica,"
-   - Exemple: "plangere principala" = "plângerea principală" = "plangerea principala"
-2. Extrageți DOAR textul care apare DUPĂ numele câmpului, FĂRĂ a include numele câmpului în valoarea extrasă
-   - Dacă textul spune "Diagnostic, are probleme cu inima", extrageți DOAR "are probleme cu inima"
-   - Dacă textul spune "Plan de tratament, 7 pastile", extrageți DOAR "7 pastile"
-   - Dacă textul spune "Examinare fizica, 40kg, 2 bete", extrageți DOAR "40kg, 2 bete"
-3. Extrageți tot textul care apare după numele câmpului până la următorul câmp sau sfârșitul propoziției
-4. Păstrați textul exact așa cum apare, chiar dacă conține erori sau pare neclar
-5. Dacă un câmp nu este găsit în text, folosiți "null"
-
-JSON OUTPUT (doar JSON, fără text suplimentar):
-"""
-    )
-    
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": user_content}
-    ]
-    
-    payload = {
-        "model": model_id,
-        "messages": messages,
-        "max_tokens": 512,
-        "temperature": 0.0
-    }
-    
+
+
+async def process_batch_item(index, filename, audio_content, target_fields, form_type, transcription_provider):
+    started = time.perf_counter()
     try:
-        with httpx.Client() as client:
-            response = client.post(
-                "https://router.huggingface.co/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key_to_use}",
-                    "Content-Type": "application/json"
-                },
-                json=payload,
-                timeout=30.0
+        async with batch_limiter.limit(transcription_provider):
+            transcription_response = await transcribe_audio_async(
+                audio_content=audio_content,
+                provider=transcription_provider,
+                language="ro"
             )
-            response.raise_for_status()
-            result = response.json()
-            response_text = result["choices"][0]["message"]["content"]
-            return response_text
-    
+        raw_transcript = transcription_response.text
+        
+        async with batch_limiter.limit("llm"):
+            parsed_json = await parse_transcript(raw_transcript, target_fields, form_type)
+        
+        return {
+            "index": index,
+            "filename": filename,
+            "status": "completed",
+            "raw_transcript": raw_transcript,
+            "parsed_json": parsed_json,
+            "time_map": time_map_to_dicts(transcription_response.time_map),
+            "seconds": round(time.perf_counter() - started, 3)
+        }
     except Exception as e:
-        error_msg = f"Extraction failed due to API error: {e}"
-        safe_print(f"ERROR in extract_data_with_api: {error_msg}")
-        return error_msg
-
+        error_type, error_msg = extract_exception_info(e)
+        safe_print(f"Batch item {index} failed: {error_type}")
+        return {
+            "index": index,
+            "filename": filename,
+            "status": "failed",
+            "error": error_msg,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+    finally:
+        audio_content.close()
 
 
 check_and_init_db()
 
+job_queue = JobQueue()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    open_http_clients()
+    await start_extraction_backend()
+    await preload_provider_clients()
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await stop_extraction_backend()
+    await close_http_clients()
+
+
 app = FastAPI(
     title="Speech-to-Text Medical System API",
     description="Backend API for managing patients and medical documents",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:5173,http://localhost:5174,http://127.0.0.1:5173,http://127.0.0.1:5174").split(",")
@@ -337,6 +223,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
@@ -352,28 +239,42 @@ async def process_recording_endpoint(
     audio_file: UploadFile = File(...),
     fields_json: str = Form(...),
     form_type: str = Form(None),
-    transcription_provider: str = Form("deepgram_whisper")
+    transcription_provider: str = Form("deepgram_whisper"),
+    async_mode: bool = Form(False)
 ):
     
+    target_fields = parse_fields_json(fields_json)
+
     try:
-        fields_data = json.loads(fields_json)
-        target_fields = fields_data.get("fields", [])
-        
-        if not target_fields or not isinstance(target_fields, list):
+        audio_content = await spool_upload(audio_file)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=413,
+            detail=str(e)
+        )
+
+    if async_mode:
+        try:
+            job = job_queue.submit(run_recording_job, audio_content, target_fields, form_type, transcription_provider)
+        except QueueFullError as e:
+            audio_content.close()
             raise HTTPException(
-                status_code=400, 
-                detail="Invalid 'fields' array provided in JSON string."
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": "5"}
             )
-            
-    except json.JSONDecodeError:
-        raise HTTPException(
-            status_code=400,
-            detail="The 'fields_json' parameter must be a valid JSON string."
+        safe_print(f"Queued recording job {job.id}, size: {len(audio_content)} bytes")
+        return JSONResponse(
+            status_code=202,
+            content={
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/api/jobs/{job.id}",
+                "events_url": f"/api/jobs/{job.id}/events"
+            }
         )
 
     try:
-        audio_content = await audio_file.read()
-        
         safe_print(f"Processing audio file: {audio_file.filename}, size: {len(audio_content)} bytes")
         safe_print(f"Content type: {audio_file.content_type}")
         safe_print(f"Form type: {form_type}")
@@ -384,7 +285,7 @@ async def process_recording_endpoint(
         )
         """
 
-        transcription_response = transcribe_audio(
+        transcription_response = await transcribe_audio_async(
             audio_content=audio_content,
             provider=transcription_provider,
             language="ro"
@@ -393,74 +294,12 @@ async def process_recording_endpoint(
         raw_transcript = transcription_response.text
         safe_print(f"Transcription successful, length: {len(raw_transcript)} chars")
 
-        if form_type and form_type in FORM_SCHEMAS:
-            predefined_schema = FORM_SCHEMAS[form_type]
-            form_schema_dict = {}
-            for field in target_fields:
-                if field in predefined_schema:
-                    form_schema_dict[field] = predefined_schema[field]
-                else:
-                    form_schema_dict[field] = f"valoarea pentru {field}"
-            safe_print(f"Using predefined schema for form type: {form_type}")
-        else:
-            form_schema_dict = {}
-            for field in target_fields:
-                form_schema_dict[field] = f"dimensiunea in mm pentru {field}"
-            safe_print("Using dynamically generated schema")
-        
-        form_schema = json.dumps(form_schema_dict, indent=2, ensure_ascii=False)
-        
-        response_text = extract_data_with_api(MODEL_ID, raw_transcript, form_schema, HF_TOKEN)
-        
-        parsed_json = extract_strict_json(response_text)
-        
-        if parsed_json is None:
-            parsed_json = {field: "" for field in target_fields}
-        else:
-            result_dict = {}
-            for field in target_fields:
-                value = parsed_json.get(field)
-                if value is None or value == "null":
-                    result_dict[field] = ""
-                elif isinstance(value, list):
-                    result_dict[field] = ", ".join(str(item) for item in value)
-                elif isinstance(value, dict):
-                    result_dict[field] = str(value)
-                else:
-                    value_str = str(value)
-                    field_lower = field.lower()
-                    value_lower = value_str.lower()
-                    
-                    if value_lower.startswith(field_lower):
-                        remaining = value_str[len(field):].strip()
-                        if remaining.startswith(','):
-                            remaining = remaining[1:].strip()
-                        if remaining.startswith(':'):
-                            remaining = remaining[1:].strip()
-                        result_dict[field] = remaining
-                    else:
-                        variations = [
-                            field.replace("ul ", " ").replace("ului ", " "),
-                            field.replace("ul ", "").replace("ului ", ""),
-                            field.split()[-1] if len(field.split()) > 1 else field
-                        ]
-                        for variation in variations:
-                            var_lower = variation.lower()
-                            if value_lower.startswith(var_lower):
-                                remaining = value_str[len(variation):].strip()
-                                if remaining.startswith(','):
-                                    remaining = remaining[1:].strip()
-                                if remaining.startswith(':'):
-                                    remaining = remaining[1:].strip()
-                                result_dict[field] = remaining
-                                break
-                        else:
-                            result_dict[field] = value_str
-            parsed_json = result_dict
+        parsed_json = await parse_transcript(raw_transcript, target_fields, form_type)
         
         return ParsedRecordingResponse(
             raw_transcript=raw_transcript,
-            parsed_json=parsed_json
+            parsed_json=parsed_json,
+            time_map=time_map_to_dicts(transcription_response.time_map)
         )
     
     except RuntimeError as e:
@@ -486,6 +325,201 @@ async def process_recording_endpoint(
             status_code=500,
             detail=f"An unexpected error occurred: {error_msg}"
         )
+    finally:
+        audio_content.close()
+
+
+@app.post("/api/process-recordings/batch", tags=["transcription"])
+async def process_recordings_batch_endpoint(
+    audio_files: List[UploadFile] = File(...),
+    fields_json: str = Form(...),
+    form_type: str = Form(None),
+    transcription_provider: str = Form("deepgram_whisper")
+):
+    target_fields = parse_fields_json(fields_json)
+    
+    if len(audio_files) > BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {BATCH_MAX_FILES} recordings."
+        )
+    
+    spooled = []
+    try:
+        for audio_file in audio_files:
+            spooled.append((audio_file.filename, await spool_upload(audio_file)))
+    except UploadTooLargeError as e:
+        for _, audio_content in spooled:
+            audio_content.close()
+        raise HTTPException(
+            status_code=413,
+            detail=f"{audio_file.filename}: {e}"
+        )
+    
+    safe_print(f"Processing batch of {len(spooled)} recordings with {transcription_provider}")
+    
+    # Items close their own file, but a client that disconnects before the
+    # stream starts, or a task cancelled before its first step, never gets
+    # there. Closing twice is harmless, so both exits close everything.
+    def close_spooled():
+        for _, audio_content in spooled:
+            audio_content.close()
+    
+    async def result_stream():
+        try:
+            started = time.perf_counter()
+            completed = 0
+            failed = 0
+            items = [
+                process_batch_item(index, filename, audio_content, target_fields, form_type, transcription_provider)
+                for index, (filename, audio_content) in enumerate(spooled)
+            ]
+            async for result in stream_as_completed(items):
+                if result["status"] == "completed":
+                    completed += 1
+                else:
+                    failed += 1
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+            
+            elapsed = time.perf_counter() - started
+            yield json.dumps({
+                "status": "summary",
+                "total": len(spooled),
+                "completed": completed,
+                "failed": failed,
+                "seconds": round(elapsed, 3),
+                "recordings_per_minute": round(len(spooled) * 60 / elapsed, 2) if elapsed > 0 else None
+            }) + "\n"
+        finally:
+            close_spooled()
+    
+    return StreamingResponse(
+        result_stream(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(close_spooled)
+    )
+
+
+@app.get("/api/jobs/stats", tags=["transcription"])
+def job_stats():
+    return job_queue.stats()
+
+
+@app.get("/api/jobs/{job_id}", tags=["transcription"])
+def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/api/jobs/{job_id}/events", tags=["transcription"])
+async def job_events(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        async for state in job.watch():
+            yield f"data: {json.dumps(state, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/api/process-recording/stream")
+async def process_recording_stream(websocket: WebSocket):
+    await websocket.accept()
+    transcriber = None
+    session = None
+    
+    try:
+        config = await websocket.receive_json()
+        target_fields = config.get("fields", [])
+        if not target_fields or not isinstance(target_fields, list):
+            await websocket.send_json({"type": "error", "detail": "Invalid 'fields' array provided."})
+            await websocket.close()
+            return
+        
+        session = StreamingExtractionSession(
+            parse_transcript,
+            websocket.send_json,
+            target_fields,
+            config.get("form_type")
+        )
+        transcriber = create_streaming_transcriber(
+            config.get("transcription_provider", "deepgram_whisper"),
+            session.on_partial,
+            language="ro"
+        )
+        await websocket.send_json({"type": "ready"})
+        
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                await transcriber.feed(message["bytes"])
+            elif message.get("text"):
+                control = json.loads(message["text"])
+                if control.get("type") == "stop":
+                    break
+        
+        final_transcript = await transcriber.finish()
+        safe_print(f"Streaming transcription finished, length: {len(final_transcript)} chars")
+        await session.finish(final_transcript, transcriber.time_map)
+        await websocket.close()
+    
+    except WebSocketDisconnect:
+        safe_print("Streaming client disconnected")
+    except Exception as e:
+        error_type, error_msg = extract_exception_info(e)
+        safe_print(f"Streaming processing failed: {error_type}")
+        try:
+            await websocket.send_json({"type": "error", "detail": error_msg})
+            await websocket.close()
+        except Exception:
+            pass
+    finally:
+        if transcriber is not None:
+            await transcriber.close()
+        if session is not None:
+            await session.close()
+
+
+@app.post("/api/parse-transcript", response_model=ParsedRecordingResponse, tags=["transcription"])
+async def parse_transcript_endpoint(request: ParseTranscriptRequest):
+    if not request.fields:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid 'fields' array provided."
+        )
+    
+    try:
+        parsed_json = await parse_transcript(request.transcript, request.fields, request.form_type)
+        return ParsedRecordingResponse(
+            raw_transcript=request.transcript,
+            parsed_json=parsed_json
+        )
+    except Exception as e:
+        error_type, error_msg = extract_exception_info(e)
+        safe_print(f"An unexpected error occurred: {error_type}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"An unexpected error occurred: {error_msg}"
+        )
+
+
+@app.get("/api/cache/stats", tags=["transcription"])
+def cache_stats():
+    return {
+        "transcripts": transcript_cache.stats(),
+        "extractions": extraction_cache.stats(),
+        "documents": document_cache.stats()
+    }
 
 
 @app.get("/")
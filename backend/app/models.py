@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -36,6 +36,10 @@ class PatientResponse(PatientBase):
         from_attributes = True
 
 
+class PatientBulkDelete(BaseModel):
+    patient_ids: List[int]
+
+
 class TranscriptionRequest(BaseModel):
     audio_file: bytes
 
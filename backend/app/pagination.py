@@ -0,0 +1,80 @@
+import os
+import json
+import base64
+from typing import NamedTuple, Optional
+from fastapi import HTTPException, Query, Response
+from firebase_admin import firestore
+from app.firestore_helpers import doc_to_dict
+from app.document_cache import document_cache
+
+LIST_PAGE_DEFAULT_LIMIT = int(os.getenv("LIST_PAGE_DEFAULT_LIMIT", "100"))
+LIST_PAGE_MAX_LIMIT = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams(NamedTuple):
+    limit: int
+    cursor: Optional[list]
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def cursor_values(cursor: list, size: int) -> list:
+    if len(cursor) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return cursor
+
+
+def page_params(
+    limit: int = Query(LIST_PAGE_DEFAULT_LIMIT, ge=1, le=LIST_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = Query(None)
+) -> PageParams:
+    return PageParams(limit, decode_cursor(cursor) if cursor else None)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+# Ties on created_at are broken by document ID, so a cursor always points at
+# exactly one position. Needs a composite index on the equality filter field
+# plus created_at descending (see firestore.indexes.json).
+def newest_first(query):
+    return (
+        query.order_by('created_at', direction=firestore.Query.DESCENDING)
+        .order_by('__name__', direction=firestore.Query.DESCENDING)
+    )
+
+
+def fetch_page(query, page: PageParams) -> tuple:
+    query = newest_first(query)
+    if page.cursor:
+        created_at, document_id = cursor_values(page.cursor, 2)
+        query = query.start_after({'created_at': created_at, '__name__': str(document_id)})
+
+    # One extra document tells whether another page exists.
+    snapshots = list(query.limit(page.limit + 1).stream())
+    next_cursor = None
+    if len(snapshots) > page.limit:
+        snapshots = snapshots[:page.limit]
+        last = snapshots[-1]
+        next_cursor = encode_cursor([last.get('created_at'), last.id])
+
+    for snapshot in snapshots:
+        document_cache.prime(snapshot)
+    documents = [document for document in (doc_to_dict(snapshot) for snapshot in snapshots) if document]
+    return documents, next_cursor
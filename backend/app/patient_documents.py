@@ -0,0 +1,64 @@
+import asyncio
+from app.database import get_firestore_db
+from app.firestore_helpers import PATIENT_DOCUMENT_COLLECTIONS, doc_to_dict, run_in_firestore_executor
+from app.document_cache import document_cache
+from app.pagination import PageParams, cursor_values, encode_cursor, newest_first
+
+
+def _timeline_key(snapshot, collection_name: str) -> tuple:
+    return snapshot.get('created_at'), collection_name, snapshot.id
+
+
+# The timeline is ordered by (created_at, document_type, document ID), newest
+# first. Relative to the cursor position, a collection that sorts after the
+# cursor's type resumes with documents of the same created_at, one that sorts
+# before it resumes strictly after it, and the cursor's own collection resumes
+# after the exact document.
+def _fetch_collection(db, collection_name: str, patient_id: int, limit: int, cursor: list = None) -> list:
+    query = newest_first(db.collection(collection_name).where('patient_id', '==', patient_id))
+    if cursor:
+        created_at, cursor_type, document_id = cursor
+        if collection_name < cursor_type:
+            query = query.start_at({'created_at': created_at})
+        elif collection_name > cursor_type:
+            query = query.start_after({'created_at': created_at})
+        else:
+            query = query.start_after({'created_at': created_at, '__name__': str(document_id)})
+    return [(_timeline_key(snapshot, collection_name), snapshot) for snapshot in query.limit(limit).stream()]
+
+
+# Every collection returns at most limit + 1 documents, all queries in flight
+# at once; the merged top `limit` is the page.
+async def get_patient_timeline(patient_id: int, page: PageParams, document_types: list = None) -> dict:
+    db = get_firestore_db()
+    cursor = cursor_values(page.cursor, 3) if page.cursor else None
+    collections = [
+        collection_name for collection_name in PATIENT_DOCUMENT_COLLECTIONS
+        if not document_types or collection_name in document_types
+    ]
+    results = await asyncio.gather(*(
+        run_in_firestore_executor(_fetch_collection, db, collection_name, patient_id, page.limit + 1, cursor)
+        for collection_name in collections
+    ))
+
+    entries = sorted(
+        (entry for collection_entries in results for entry in collection_entries),
+        key=lambda entry: entry[0],
+        reverse=True
+    )
+    next_cursor = encode_cursor(list(entries[page.limit - 1][0])) if len(entries) > page.limit else None
+
+    documents = []
+    for (_, collection_name, _), snapshot in entries[:page.limit]:
+        document_cache.prime(snapshot)
+        document = doc_to_dict(snapshot)
+        if document:
+            document['document_type'] = collection_name
+            documents.append(document)
+
+    return {
+        "patient_id": patient_id,
+        "limit": page.limit,
+        "next_cursor": next_cursor,
+        "documents": documents
+    }
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Response
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel
 from app.database import get_firestore_db
-from app.firestore_helpers import get_next_id, doc_to_dict
+from app.firestore_helpers import get_next_id
+from app.document_cache import document_cache
+from app.pagination import PageParams, page_params, fetch_page, set_next_cursor
 from firebase_admin import firestore
 
 router = APIRouter()
@@ -26,45 +28,30 @@ class ConsultationFormResponse(ConsultationFormBase):
 
 
 @router.get("/patient/{patient_id}", response_model=List[ConsultationFormResponse])
-async def get_consultation_forms(patient_id: int):
+async def get_consultation_forms(patient_id: int, response: Response, page: PageParams = Depends(page_params)):
     db = get_firestore_db()
     forms_ref = db.collection('consultation_forms')
     
-    docs = forms_ref.where('patient_id', '==', patient_id).stream()
-    
-    forms = []
-    for doc in docs:
-        form_data = doc_to_dict(doc)
-        if form_data:
-            forms.append(form_data)
-    
-    forms.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+    forms, next_cursor = fetch_page(forms_ref.where('patient_id', '==', patient_id), page)
+    set_next_cursor(response, next_cursor)
     
     return forms
 
 
 @router.get("/{form_id}", response_model=ConsultationFormResponse)
 async def get_consultation_form(form_id: int):
-    db = get_firestore_db()
-    forms_ref = db.collection('consultation_forms')
+    form = document_cache.get('consultation_forms', form_id)
     
-    doc_ref = forms_ref.document(str(form_id))
-    doc = doc_ref.get()
-    
-    if not doc.exists:
+    if form is None:
         raise HTTPException(status_code=404, detail="Form not found")
     
-    return doc_to_dict(doc)
+    form.setdefault('id', form_id)
+    return form
 
 
 @router.post("/", response_model=ConsultationFormResponse)
 async def create_consultation_form(form_data: ConsultationFormBase):
-    db = get_firestore_db()
-    forms_ref = db.collection('consultation_forms')
-    patients_ref = db.collection('patients')
-    
-    patient_doc = patients_ref.document(str(form_data.patient_id)).get()
-    if not patient_doc.exists:
+    if document_cache.get('patients', form_data.patient_id) is None:
         raise HTTPException(status_code=404, detail="Patient not found")
     
     current_time = datetime.now().isoformat()
@@ -76,32 +63,26 @@ async def create_consultation_form(form_data: ConsultationFormBase):
     form_dict['created_at'] = current_time
     form_dict['updated_at'] = current_time
     
-    doc_ref = forms_ref.document(str(form_id))
-    doc_ref.set(form_dict)
+    document_cache.set('consultation_forms', form_id, form_dict)
     
     return form_dict
 
 
 @router.put("/{form_id}", response_model=ConsultationFormResponse)
 async def update_consultation_form(form_id: int, form_data: ConsultationFormBase):
-    db = get_firestore_db()
-    forms_ref = db.collection('consultation_forms')
-    
-    doc_ref = forms_ref.document(str(form_id))
-    doc = doc_ref.get()
+    form = document_cache.get('consultation_forms', form_id)
     
-    if not doc.exists:
+    if form is None:
         raise HTTPException(status_code=404, detail="Form not found")
     
     current_time = datetime.now().isoformat()
-    created_at = doc.to_dict().get('created_at', current_time)
+    created_at = form.get('created_at', current_time)
     
     update_data = form_data.model_dump()
     update_data['patient_id'] = int(update_data['patient_id'])
     update_data['updated_at'] = current_time
-    doc_ref.update(update_data)
     
-    result = doc_ref.get().to_dict()
+    result = document_cache.update('consultation_forms', form_id, form, update_data)
     result['id'] = form_id
     result['created_at'] = created_at
     
@@ -110,12 +91,8 @@ async def update_consultation_form(form_id: int, form_data: ConsultationFormBase
 
 @router.delete("/{form_id}")
 async def delete_consultation_form(form_id: int):
-    db = get_firestore_db()
-    forms_ref = db.collection('consultation_forms')
-    
-    doc_ref = forms_ref.document(str(form_id))
-    if not doc_ref.get().exists:
+    if document_cache.get('consultation_forms', form_id) is None:
         raise HTTPException(status_code=404, detail="Form not found")
     
-    doc_ref.delete()
+    document_cache.delete('consultation_forms', form_id)
     return {"message": "Form deleted successfully"}
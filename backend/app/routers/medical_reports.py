@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Response
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel
 from app.database import get_firestore_db
-from app.firestore_helpers import get_next_id, doc_to_dict
+from app.firestore_helpers import get_next_id
+from app.document_cache import document_cache
+from app.pagination import PageParams, page_params, fetch_page, set_next_cursor
 from firebase_admin import firestore
 
 router = APIRouter()
@@ -28,45 +30,30 @@ class MedicalReportResponse(MedicalReportBase):
 
 
 @router.get("/patient/{patient_id}", response_model=List[MedicalReportResponse])
-async def get_medical_reports(patient_id: int):
+async def get_medical_reports(patient_id: int, response: Response, page: PageParams = Depends(page_params)):
     db = get_firestore_db()
     reports_ref = db.collection('medical_reports')
     
-    docs = reports_ref.where('patient_id', '==', patient_id).stream()
-    
-    reports = []
-    for doc in docs:
-        report_data = doc_to_dict(doc)
-        if report_data:
-            reports.append(report_data)
-    
-    reports.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+    reports, next_cursor = fetch_page(reports_ref.where('patient_id', '==', patient_id), page)
+    set_next_cursor(response, next_cursor)
     
     return reports
 
 
 @router.get("/{form_id}", response_model=MedicalReportResponse)
 async def get_medical_report(form_id: int):
-    db = get_firestore_db()
-    reports_ref = db.collection('medical_reports')
+    report = document_cache.get('medical_reports', form_id)
     
-    doc_ref = reports_ref.document(str(form_id))
-    doc = doc_ref.get()
-    
-    if not doc.exists:
+    if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    return doc_to_dict(doc)
+    report.setdefault('id', form_id)
+    return report
 
 
 @router.post("/", response_model=MedicalReportResponse)
 async def create_medical_report(form_data: MedicalReportBase):
-    db = get_firestore_db()
-    reports_ref = db.collection('medical_reports')
-    patients_ref = db.collection('patients')
-    
-    patient_doc = patients_ref.document(str(form_data.patient_id)).get()
-    if not patient_doc.exists:
+    if document_cache.get('patients', form_data.patient_id) is None:
         raise HTTPException(status_code=404, detail="Patient not found")
     
     current_time = datetime.now().isoformat()
@@ -78,32 +65,26 @@ async def create_medical_report(form_data: MedicalReportBase):
     report_dict['created_at'] = current_time
     report_dict['updated_at'] = current_time
     
-    doc_ref = reports_ref.document(str(form_id))
-    doc_ref.set(report_dict)
+    document_cache.set('medical_reports', form_id, report_dict)
     
     return report_dict
 
 
 @router.put("/{form_id}", response_model=MedicalReportResponse)
 async def update_medical_report(form_id: int, form_data: MedicalReportBase):
-    db = get_firestore_db()
-    reports_ref = db.collection('medical_reports')
-    
-    doc_ref = reports_ref.document(str(form_id))
-    doc = doc_ref.get()
+    report = document_cache.get('medical_reports', form_id)
     
-    if not doc.exists:
+    if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
     current_time = datetime.now().isoformat()
-    created_at = doc.to_dict().get('created_at', current_time)
+    created_at = report.get('created_at', current_time)
     
     update_data = form_data.model_dump()
     update_data['patient_id'] = int(update_data['patient_id'])
     update_data['updated_at'] = current_time
-    doc_ref.update(update_data)
     
-    result = doc_ref.get().to_dict()
+    result = document_cache.update('medical_reports', form_id, report, update_data)
     result['id'] = form_id
     result['created_at'] = created_at
     
@@ -112,12 +93,8 @@ async def update_medical_report(form_id: int, form_data: MedicalReportBase):
 
 @router.delete("/{form_id}")
 async def delete_medical_report(form_id: int):
-    db = get_firestore_db()
-    reports_ref = db.collection('medical_reports')
-    
-    doc_ref = reports_ref.document(str(form_id))
-    if not doc_ref.get().exists:
+    if document_cache.get('medical_reports', form_id) is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    doc_ref.delete()
+    document_cache.delete('medical_reports', form_id)
     return {"message": "Report deleted successfully"}
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Response
 from datetime import datetime
 from typing import List
 from pydantic import BaseModel
 from app.database import get_firestore_db
-from app.firestore_helpers import get_next_id, doc_to_dict
+from app.firestore_helpers import get_next_id
+from app.document_cache import document_cache
+from app.pagination import PageParams, page_params, fetch_page, set_next_cursor
 from firebase_admin import firestore
 
 router = APIRouter()
@@ -41,43 +43,34 @@ class NewPatientFormResponse(NewPatientFormBase):
 
 
 @router.get("/patient/{patient_id}", response_model=List[NewPatientFormResponse])
-async def get_new_patient_form(patient_id: int):
+async def get_new_patient_form(patient_id: int, response: Response, page: PageParams = Depends(page_params)):
     db = get_firestore_db()
     forms_ref = db.collection('new_patient_forms')
     
-    docs = forms_ref.where('patient_id', '==', patient_id).stream()
-    forms = []
-    for doc in docs:
-        form_data = doc_to_dict(doc)
-        if form_data:
-            forms.append(form_data)
+    forms, next_cursor = fetch_page(forms_ref.where('patient_id', '==', patient_id), page)
+    set_next_cursor(response, next_cursor)
     
     return forms
 
 
 @router.get("/{form_id}", response_model=NewPatientFormResponse)
 async def get_new_patient_form_by_id(form_id: int):
-    db = get_firestore_db()
-    forms_ref = db.collection('new_patient_forms')
+    form = document_cache.get('new_patient_forms', form_id)
     
-    doc_ref = forms_ref.document(str(form_id))
-    doc = doc_ref.get()
-    
-    if not doc.exists:
+    if form is None:
         raise HTTPException(status_code=404, detail="Form not found")
     
-    return doc_to_dict(doc)
+    form.setdefault('id', form_id)
+    return form
 
 
 @router.post("/", response_model=NewPatientFormResponse)
 async def create_new_patient_form(form_data: NewPatientFormBase):
+    if document_cache.get('patients', form_data.patient_id) is None:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    
     db = get_firestore_db()
     forms_ref = db.collection('new_patient_forms')
-    patients_ref = db.collection('patients')
-    
-    patient_doc = patients_ref.document(str(form_data.patient_id)).get()
-    if not patient_doc.exists:
-        raise HTTPException(status_code=404, detail="Patient not found")
     
     existing_docs = forms_ref.where('patient_id', '==', form_data.patient_id).limit(1).stream()
     existing_list = list(existing_docs)
@@ -91,9 +84,8 @@ async def create_new_patient_form(form_data: NewPatientFormBase):
         update_data = form_data.model_dump()
         update_data['patient_id'] = int(update_data['patient_id'])
         update_data['updated_at'] = current_time
-        existing_doc.reference.update(update_data)
         
-        result = existing_doc.reference.get().to_dict()
+        result = document_cache.update('new_patient_forms', existing_doc.id, existing_doc.to_dict(), update_data)
         result['id'] = form_id
         result['created_at'] = existing_doc.to_dict().get('created_at', current_time)
         return result
@@ -106,26 +98,19 @@ async def create_new_patient_form(form_data: NewPatientFormBase):
         form_dict['created_at'] = current_time
         form_dict['updated_at'] = current_time
         
-        doc_ref = forms_ref.document(str(form_id))
-        doc_ref.set(form_dict)
+        document_cache.set('new_patient_forms', form_id, form_dict)
         
         return form_dict
 
 
 @router.put("/{form_id}", response_model=NewPatientFormResponse)
 async def update_new_patient_form(form_id: int, form_data: NewPatientFormBase):
-    db = get_firestore_db()
-    forms_ref = db.collection('new_patient_forms')
-    patients_ref = db.collection('patients')
-    
-    doc_ref = forms_ref.document(str(form_id))
-    doc = doc_ref.get()
+    form = document_cache.get('new_patient_forms', form_id)
     
-    if not doc.exists:
+    if form is None:
         raise HTTPException(status_code=404, detail="Form not found")
     
-    patient_doc = patients_ref.document(str(form_data.patient_id)).get()
-    if not patient_doc.exists:
+    if document_cache.get('patients', form_data.patient_id) is None:
         raise HTTPException(status_code=404, detail="Patient not found")
     
     current_time = datetime.now().isoformat()
@@ -133,26 +118,20 @@ async def update_new_patient_form(form_id: int, form_data: NewPatientFormBase):
     update_data = form_data.model_dump()
     update_data['patient_id'] = int(update_data['patient_id'])
     update_data['updated_at'] = current_time
-    doc_ref.update(update_data)
     
-    updated_doc = doc_ref.get()
-    result = updated_doc.to_dict()
+    result = document_cache.update('new_patient_forms', form_id, form, update_data)
     result['id'] = form_id
-    result['created_at'] = doc.to_dict().get('created_at', current_time)
+    result['created_at'] = form.get('created_at', current_time)
     
     return result
 
 
 @router.delete("/{form_id}")
 async def delete_new_patient_form_by_id(form_id: int):
-    db = get_firestore_db()
-    forms_ref = db.collection('new_patient_forms')
-    
-    doc_ref = forms_ref.document(str(form_id))
-    if not doc_ref.get().exists:
+    if document_cache.get('new_patient_forms', form_id) is None:
         raise HTTPException(status_code=404, detail="Form not found")
     
-    doc_ref.delete()
+    document_cache.delete('new_patient_forms', form_id)
     return {"message": "Form deleted successfully"}
 
 
@@ -164,7 +143,7 @@ async def delete_new_patient_form(patient_id: int):
     docs = forms_ref.where('patient_id', '==', patient_id).stream()
     deleted_count = 0
     for doc in docs:
-        doc.reference.delete()
+        document_cache.delete('new_patient_forms', doc.id)
         deleted_count += 1
     
     return {"message": "Form deleted successfully", "deleted_count": deleted_count}
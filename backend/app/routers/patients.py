@@ -1,45 +1,39 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
 from datetime import datetime
 from typing import List, Optional
-from app.models import PatientCreate, PatientUpdate, PatientResponse
+from app.models import PatientCreate, PatientUpdate, PatientResponse, PatientBulkDelete
 from app.database import get_firestore_db
 from app.routers.auth import get_current_doctor_id
-from app.firestore_helpers import get_next_id
+from app.firestore_helpers import get_next_id, PATIENT_DOCUMENT_COLLECTIONS, run_in_firestore_executor
+from app.cascade_delete import cascade_delete_patients
+from app.document_cache import document_cache
+from app.patient_documents import get_patient_timeline
+from app.pagination import PageParams, page_params, fetch_page, set_next_cursor
 from firebase_admin import firestore
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[PatientResponse])
-async def get_patients(doctor_id: int = Depends(get_current_doctor_id)):
+async def get_patients(response: Response, page: PageParams = Depends(page_params),
+                       doctor_id: int = Depends(get_current_doctor_id)):
     db = get_firestore_db()
     patients_ref = db.collection('patients')
     
-    docs = patients_ref.where('doctor_id', '==', doctor_id).stream()
-    
-    patients = []
-    for doc in docs:
-        doc_data = doc.to_dict()
-        doc_data['id'] = doc_data.get('id', int(doc.id) if doc.id.isdigit() else None)
-        patients.append(doc_data)
-    
-    patients.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+    patients, next_cursor = fetch_page(patients_ref.where('doctor_id', '==', doctor_id), page)
+    set_next_cursor(response, next_cursor)
     
     return patients
 
 
 @router.get("/{patient_id}", response_model=PatientResponse)
 async def get_patient(patient_id: int, doctor_id: int = Depends(get_current_doctor_id)):
-    db = get_firestore_db()
-    patients_ref = db.collection('patients')
-    
-    doc_ref = patients_ref.document(str(patient_id))
-    doc = doc_ref.get()
+    doc_data = document_cache.get('patients', patient_id)
     
-    if not doc.exists:
+    if doc_data is None:
         raise HTTPException(status_code=404, detail="Patient not found")
     
-    doc_data = doc.to_dict()
     if doc_data.get('doctor_id') != doctor_id:
         raise HTTPException(status_code=404, detail="Patient not found")
     
@@ -47,11 +41,31 @@ async def get_patient(patient_id: int, doctor_id: int = Depends(get_current_doct
     return doc_data
 
 
+@router.get("/{patient_id}/documents")
+async def get_patient_documents(
+    patient_id: int,
+    page: PageParams = Depends(page_params),
+    document_type: Optional[List[str]] = Query(None),
+    doctor_id: int = Depends(get_current_doctor_id)
+):
+    if document_type:
+        unknown_types = [name for name in document_type if name not in PATIENT_DOCUMENT_COLLECTIONS]
+        if unknown_types:
+            raise HTTPException(status_code=400, detail=f"Unknown document type: {', '.join(unknown_types)}")
+    
+    doc_data, timeline = await asyncio.gather(
+        run_in_firestore_executor(document_cache.get, 'patients', patient_id),
+        get_patient_timeline(patient_id, page, document_type)
+    )
+    
+    if doc_data is None or doc_data.get('doctor_id') != doctor_id:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    
+    return timeline
+
+
 @router.post("/", response_model=PatientResponse)
 async def create_patient(patient: PatientCreate, doctor_id: int = Depends(get_current_doctor_id)):
-    db = get_firestore_db()
-    patients_ref = db.collection('patients')
-    
     current_time = datetime.now().isoformat()
     patient_id = get_next_id('patients')
     
@@ -75,24 +89,18 @@ async def create_patient(patient: PatientCreate, doctor_id: int = Depends(get_cu
         'updated_at': current_time
     }
     
-    doc_ref = patients_ref.document(str(patient_id))
-    doc_ref.set(patient_data)
+    document_cache.set('patients', patient_id, patient_data)
     
     return patient_data
 
 
 @router.put("/{patient_id}", response_model=PatientResponse)
 async def update_patient(patient_id: int, patient: PatientUpdate, doctor_id: int = Depends(get_current_doctor_id)):
-    db = get_firestore_db()
-    patients_ref = db.collection('patients')
-    
-    doc_ref = patients_ref.document(str(patient_id))
-    doc = doc_ref.get()
+    doc_data = document_cache.get('patients', patient_id)
     
-    if not doc.exists:
+    if doc_data is None:
         raise HTTPException(status_code=404, detail="Patient not found")
     
-    doc_data = doc.to_dict()
     if doc_data.get('doctor_id') != doctor_id:
         raise HTTPException(status_code=404, detail="Patient not found")
     
@@ -115,10 +123,7 @@ async def update_patient(patient_id: int, patient: PatientUpdate, doctor_id: int
         'updated_at': current_time
     }
     
-    doc_ref.update(update_data)
-    
-    updated_doc = doc_ref.get()
-    result = updated_doc.to_dict()
+    result = document_cache.update('patients', patient_id, doc_data, update_data)
     result['id'] = patient_id
     result['created_at'] = doc_data.get('created_at', current_time)
     
@@ -127,63 +132,48 @@ async def update_patient(patient_id: int, patient: PatientUpdate, doctor_id: int
 
 @router.delete("/{patient_id}")
 async def delete_patient(patient_id: int, doctor_id: int = Depends(get_current_doctor_id)):
-    db = get_firestore_db()
+    doc_data = document_cache.get('patients', patient_id)
     
-    patients_ref = db.collection('patients')
-    doc_ref = patients_ref.document(str(patient_id))
-    doc = doc_ref.get()
-    
-    if not doc.exists:
+    if doc_data is None:
         raise HTTPException(status_code=404, detail="Patient not found")
     
-    doc_data = doc.to_dict()
     if doc_data.get('doctor_id') != doctor_id:
         raise HTTPException(status_code=404, detail="Patient not found")
     
     print(f"Deleting patient with ID: {patient_id}")
     
-    deleted_counts = {
-        'prescription_forms': 0,
-        'consultation_forms': 0,
-        'medical_reports': 0,
-        'new_patient_forms': 0,
-        'echocardiography_forms': 0
-    }
-    
-    prescription_ref = db.collection('prescription_forms')
-    prescriptions = prescription_ref.where('patient_id', '==', patient_id).stream()
-    for presc in prescriptions:
-        presc.reference.delete()
-        deleted_counts['prescription_forms'] += 1
-    
-    consultation_ref = db.collection('consultation_forms')
-    consultations = consultation_ref.where('patient_id', '==', patient_id).stream()
-    for consult in consultations:
-        consult.reference.delete()
-        deleted_counts['consultation_forms'] += 1
-    
-    reports_ref = db.collection('medical_reports')
-    reports = reports_ref.where('patient_id', '==', patient_id).stream()
-    for report in reports:
-        report.reference.delete()
-        deleted_counts['medical_reports'] += 1
-    
-    new_patient_ref = db.collection('new_patient_forms')
-    new_forms = new_patient_ref.where('patient_id', '==', patient_id).stream()
-    for form in new_forms:
-        form.reference.delete()
-        deleted_counts['new_patient_forms'] += 1
-    
-    echocardiography_ref = db.collection('echocardiography_forms')
-    echocardiography_forms = echocardiography_ref.where('patient_id', '==', patient_id).stream()
-    for form in echocardiography_forms:
-        form.reference.delete()
-        deleted_counts['echocardiography_forms'] += 1
-    
-    doc_ref.delete()
+    deleted_counts = await cascade_delete_patients([patient_id])
     print(f"Deleted patient {patient_id}")
     
     return {
         "message": "Patient and all associated documents deleted successfully",
         "deleted_documents": deleted_counts
     }
+
+
+@router.post("/bulk-delete")
+async def bulk_delete_patients(request: PatientBulkDelete, doctor_id: int = Depends(get_current_doctor_id)):
+    db = get_firestore_db()
+    patients_ref = db.collection('patients')
+    
+    requested_ids = list(dict.fromkeys(request.patient_ids))
+    if not requested_ids:
+        raise HTTPException(status_code=400, detail="No patient IDs provided")
+    
+    docs = db.get_all([patients_ref.document(str(patient_id)) for patient_id in requested_ids])
+    owned_ids = {
+        int(doc.id) for doc in docs
+        if doc.exists and doc.to_dict().get('doctor_id') == doctor_id
+    }
+    patient_ids = [patient_id for patient_id in requested_ids if patient_id in owned_ids]
+    not_found = [patient_id for patient_id in requested_ids if patient_id not in owned_ids]
+    
+    print(f"Bulk deleting {len(patient_ids)} patients")
+    deleted_counts = await cascade_delete_patients(patient_ids) if patient_ids else {}
+    
+    return {
+        "message": f"Deleted {len(patient_ids)} patients and all associated documents",
+        "deleted_patients": patient_ids,
+        "not_found": not_found,
+        "deleted_documents": deleted_counts
+    }
@@ -0,0 +1,94 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+_DIACRITICS_TABLE = str.maketrans("ăâîșşțţĂÂÎȘŞȚŢ", "aaissttAAISSTT")
+
+
+def fold_diacritics(text: str) -> str:
+    return text.translate(_DIACRITICS_TABLE)
+
+
+def normalize_for_matching(text: str) -> str:
+    # Folding and lowercasing must keep offsets aligned with the original text,
+    # so characters whose lowercase form is longer are only folded.
+    normalized = fold_diacritics(text).lower()
+    if len(normalized) == len(text):
+        return normalized
+    return "".join(
+        lowered if len(lowered) == 1 else char
+        for char, lowered in ((char, char.lower()) for char in fold_diacritics(text))
+    )
+
+
+def label_variants(field_name: str) -> set:
+    words = normalize_for_matching(field_name).split()
+    if not words:
+        return set()
+    variants = {" ".join(words)}
+    first, rest = words[0], words[1:]
+    if first.endswith("u"):
+        articulated = [first + "l", first + "lui"]
+    elif first[-1] not in "aeiouy":
+        articulated = [first + "ul", first + "ului"]
+    else:
+        articulated = []
+    for form in articulated:
+        variants.add(" ".join([form] + rest))
+    return variants
+
+
+class FieldSpan(NamedTuple):
+    field: str
+    label_start: int
+    label_end: int
+    value_start: int
+    value_end: int
+
+
+# All label variants of a schema compiled into one alternation, so a transcript
+# is split into field-labelled spans with a single regex pass.
+class TranscriptSegmenter:
+    def __init__(self, field_names):
+        self.field_names = tuple(field_names)
+        self._field_by_variant = {}
+        for field in self.field_names:
+            for variant in label_variants(field):
+                self._field_by_variant.setdefault(variant, field)
+
+        alternatives = sorted(self._field_by_variant, key=len, reverse=True)
+        if alternatives:
+            pattern = "|".join(r"\s+".join(re.escape(word) for word in variant.split()) for variant in alternatives)
+            self._regex = re.compile(rf"(?<!\w)(?:{pattern})(?!\w)")
+        else:
+            self._regex = None
+
+    def find_labels(self, transcript: str):
+        if self._regex is None:
+            return []
+        normalized = normalize_for_matching(transcript)
+        labels = []
+        for match in self._regex.finditer(normalized):
+            variant = " ".join(match.group(0).split())
+            labels.append((self._field_by_variant[variant], match.start(), match.end()))
+        return labels
+
+    def segment(self, transcript: str, labels: list = None) -> list:
+        if labels is None:
+            labels = self.find_labels(transcript)
+        spans = []
+        for index, (field, start, end) in enumerate(labels):
+            value_end = labels[index + 1][1] if index + 1 < len(labels) else len(transcript)
+            spans.append(FieldSpan(field, start, end, end, value_end))
+        return spans
+
+    def first_spans(self, transcript: str, labels: list = None) -> dict:
+        spans = {}
+        for span in self.segment(transcript, labels):
+            spans.setdefault(span.field, span)
+        return spans
+
+
+@lru_cache(maxsize=64)
+def get_segmenter(field_names: tuple) -> TranscriptSegmenter:
+    return TranscriptSegmenter(field_names)
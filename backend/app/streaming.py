@@ -0,0 +1,212 @@
+import os
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+from app.transcription import TRANSCRIPTION_PROVIDERS, transcribe_audio_async
+from app.audio_upload import ensure_upload_size
+from app.vad import time_map_to_dicts
+
+STREAMING_TRANSCRIBE_INTERVAL_SECONDS = float(os.getenv("STREAMING_TRANSCRIBE_INTERVAL_SECONDS", "4"))
+STREAMING_EXTRACTION_INTERVAL_SECONDS = float(os.getenv("STREAMING_EXTRACTION_INTERVAL_SECONDS", "2"))
+# Batch providers that may be used for live partials by re-transcribing the
+# whole recording every interval. Each snapshot is billed in full, so vendor
+# cost grows with the square of the recording length; empty disables it.
+STREAMING_ROLLING_BATCH_PROVIDERS = {
+    name.strip().lower()
+    for name in os.getenv("STREAMING_ROLLING_BATCH_PROVIDERS", "").split(",")
+    if name.strip()
+}
+
+PartialCallback = Callable[[str, str], Awaitable[None]]
+
+
+def common_word_prefix(previous: str, current: str) -> str:
+    prefix = []
+    for previous_word, current_word in zip(previous.split(), current.split()):
+        if previous_word != current_word:
+            break
+        prefix.append(current_word)
+    return " ".join(prefix)
+
+
+class StreamingTranscriber(ABC):
+    def __init__(self, on_partial: PartialCallback, language: str = "ro"):
+        self.on_partial = on_partial
+        self.language = language
+        # Set by finish() when the final transcript was made from trimmed audio.
+        self.time_map = None
+
+    @abstractmethod
+    async def feed(self, chunk: bytes):
+        pass
+
+    @abstractmethod
+    async def finish(self) -> str:
+        pass
+
+    async def close(self):
+        pass
+
+
+# Treats every chunk as UTF-8 text, so the socket protocol and the incremental
+# extraction can be exercised locally without audio or a vendor account.
+class FakeStreamingTranscriber(StreamingTranscriber):
+    def __init__(self, on_partial: PartialCallback, language: str = "ro"):
+        super().__init__(on_partial, language)
+        self._text = ""
+
+    async def feed(self, chunk: bytes):
+        self._text += chunk.decode("utf-8", errors="ignore")
+        text = " ".join(self._text.split())
+        if self._text[-1:].isspace():
+            stable_text = text
+        else:
+            stable_text = " ".join(text.split()[:-1])
+        await self.on_partial(text, stable_text)
+
+    async def finish(self) -> str:
+        return " ".join(self._text.split())
+
+
+# Periodically re-transcribes the growing recording with a batch provider.
+# Words on which two consecutive hypotheses agree are reported as stable.
+# Snapshots bypass the transcript cache; only the final transcript is cached.
+class RollingBatchTranscriber(StreamingTranscriber):
+    def __init__(self, on_partial: PartialCallback, provider: str, language: str = "ro",
+                 interval_seconds: float = STREAMING_TRANSCRIBE_INTERVAL_SECONDS):
+        super().__init__(on_partial, language)
+        self.provider = provider
+        self.interval_seconds = interval_seconds
+        self._buffer = bytearray()
+        self._previous_text = ""
+        self._task = None
+        self._last_started = 0.0
+
+    async def feed(self, chunk: bytes):
+        ensure_upload_size(len(self._buffer) + len(chunk))
+        self._buffer.extend(chunk)
+        if self._task is not None and not self._task.done():
+            return
+        now = time.monotonic()
+        if now - self._last_started < self.interval_seconds:
+            return
+        self._last_started = now
+        self._task = asyncio.create_task(self._transcribe_snapshot(bytes(self._buffer)))
+
+    async def _transcribe_snapshot(self, audio_content: bytes):
+        try:
+            result = await transcribe_audio_async(audio_content, self.provider, self.language, use_cache=False)
+        except Exception as e:
+            print(f"Partial transcription failed: {type(e).__name__}")
+            return
+        stable_text = common_word_prefix(self._previous_text, result.text)
+        self._previous_text = result.text
+        await self.on_partial(result.text, stable_text)
+
+    async def finish(self) -> str:
+        await self.close()
+        if not self._buffer:
+            raise RuntimeError("No audio received")
+        audio_content = bytes(self._buffer)
+        self._buffer = bytearray()
+        result = await transcribe_audio_async(audio_content, self.provider, self.language)
+        self.time_map = result.time_map
+        return result.text
+
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+STREAMING_PROVIDERS = {
+    "fake": FakeStreamingTranscriber,
+}
+
+
+def create_streaming_transcriber(provider: str, on_partial: PartialCallback, language: str = "ro") -> StreamingTranscriber:
+    provider = provider.lower()
+    factory = STREAMING_PROVIDERS.get(provider)
+    if factory is not None:
+        return factory(on_partial, language=language)
+    if provider in TRANSCRIPTION_PROVIDERS and provider in STREAMING_ROLLING_BATCH_PROVIDERS:
+        return RollingBatchTranscriber(on_partial, provider, language=language)
+    if provider in TRANSCRIPTION_PROVIDERS:
+        raise ValueError(
+            f"Streaming is not enabled for provider '{provider}' (see STREAMING_ROLLING_BATCH_PROVIDERS)"
+        )
+    raise ValueError(f"Unsupported streaming transcription provider: {provider}")
+
+
+# Runs field extraction on the stable part of the transcript while recording
+# continues. Only one extraction is in flight; newer text supersedes older text.
+class StreamingExtractionSession:
+    def __init__(self, parse_fn, send_json, target_fields: list, form_type: str = None):
+        self.parse_fn = parse_fn
+        self.send_json = send_json
+        self.target_fields = target_fields
+        self.form_type = form_type
+        self._latest_stable_text = ""
+        self._task = None
+
+    async def on_partial(self, text: str, stable_text: str):
+        await self.send_json({
+            "type": "partial_transcript",
+            "text": text,
+            "stable_text": stable_text
+        })
+        if not stable_text or stable_text == self._latest_stable_text:
+            return
+        self._latest_stable_text = stable_text
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._extract_latest())
+
+    async def _extract_latest(self):
+        extracted_text = None
+        while extracted_text != self._latest_stable_text:
+            extracted_text = self._latest_stable_text
+            try:
+                # Partial text is superseded within seconds; caching it would
+                # evict real entries and write patient text to the disk tier.
+                parsed_json = await self.parse_fn(extracted_text, self.target_fields, self.form_type, use_cache=False)
+            except Exception as e:
+                print(f"Partial extraction failed: {type(e).__name__}")
+                return
+            filled_fields = {field: value for field, value in parsed_json.items() if value}
+            if filled_fields:
+                await self.send_json({
+                    "type": "partial_fields",
+                    "parsed_json": filled_fields
+                })
+            await asyncio.sleep(STREAMING_EXTRACTION_INTERVAL_SECONDS)
+
+    async def _send_field(self, field: str, value: str):
+        await self.send_json({
+            "type": "field",
+            "field": field,
+            "value": value
+        })
+
+    async def finish(self, final_transcript: str, time_map: list = None):
+        await self.close()
+        # Each field is pushed as soon as its pair is complete in the LLM
+        # token stream; "final" still carries the full, merged result.
+        parsed_json = await self.parse_fn(final_transcript, self.target_fields, self.form_type, self._send_field)
+        await self.send_json({
+            "type": "final",
+            "raw_transcript": final_transcript,
+            "parsed_json": parsed_json,
+            "time_map": time_map_to_dicts(time_map)
+        })
+
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
@@ -1,63 +1,123 @@
 import os
-import requests
+import asyncio
+import threading
+import hashlib
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from deepgram import DeepgramClient
 from huggingface_hub import InferenceClient
-import io
-import soundfile as sf
+import tempfile
+from typing import Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from app.http_clients import get_whisper_hosted_client
+from app.cache import build_tiered_cache
+from app.audio_upload import SpooledAudio
+from app.local_whisper import LocalWhisperPool
+from app.audio_processing import AUDIO_MIME_TYPES, NORMALIZED_AUDIO_FORMAT, encode_audio, normalize_audio, trim_audio_for_upload
+from app.vad import VAD_ENABLED, TimeMapEntry
 
 class TranscriptionResult(BaseModel):
     text: str
+    # Set when silence was trimmed: (processed_start, original_start, duration)
+    # entries for mapping provider timestamps back to the recording.
+    time_map: Optional[list] = None
+
+AudioInput = Union[bytes, SpooledAudio]
 
 load_dotenv()
 
 
 DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY", "")
 HF_TOKEN = os.getenv("HF_TOKEN", "")
+TRANSCRIPTION_MAX_WORKERS = int(os.getenv("TRANSCRIPTION_MAX_WORKERS", "32"))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "256"))
+TRANSCRIPT_CACHE_TTL_SECONDS = float(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", "86400"))
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", "")
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+# Comma separated provider clients to build at startup, e.g. "local_whisper".
+TRANSCRIPTION_PRELOAD_PROVIDERS = os.getenv("TRANSCRIPTION_PRELOAD_PROVIDERS", "")
 
 hf_client = InferenceClient(
     provider="hf-inference",
     api_key= HF_TOKEN
 )
 
+# The provider SDKs are blocking, so calls run on a dedicated bounded pool
+# instead of the event loop or Starlette's shared threadpool.
+_transcription_executor = ThreadPoolExecutor(
+    max_workers=TRANSCRIPTION_MAX_WORKERS,
+    thread_name_prefix="transcription"
+)
 
 
-def transcribe_with_whisper_deepgram(
-    audio_content: bytes,
-    language: str = "ro"
-) -> TranscriptionResult:
-    if not DEEPGRAM_API_KEY:
-        raise RuntimeError("DEEPGRAM_API_KEY is not set")
-
-    dg = DeepgramClient(api_key=DEEPGRAM_API_KEY)
-
-    response = dg.listen.v1.media.transcribe_file(
-        request=audio_content,
-        model="whisper",
-        language=language,
-        smart_format=True,
-    )
+transcript_cache = build_tiered_cache(
+    max_entries=TRANSCRIPT_CACHE_MAX_ENTRIES,
+    ttl_seconds=TRANSCRIPT_CACHE_TTL_SECONDS,
+    directory=TRANSCRIPT_CACHE_DIR,
+    max_bytes=TRANSCRIPT_CACHE_MAX_BYTES
+)
 
-    text = response.results.channels[0].alternatives[0].transcript.strip()
 
-    if not text:
-        raise RuntimeError("Empty transcript from Deepgram")
+# Provider SDK clients are built once and reused, so their connection pools
+# survive across transcriptions.
+_provider_clients = {}
+_provider_clients_lock = threading.Lock()
 
-    return TranscriptionResult(text=text)
 
-def transcribe_with_nova3(
-    audio_content: bytes,
-    language: str = "ro"
-) -> TranscriptionResult:
+def _create_deepgram_client() -> DeepgramClient:
     if not DEEPGRAM_API_KEY:
         raise RuntimeError("DEEPGRAM_API_KEY is not set")
+    return DeepgramClient(api_key=DEEPGRAM_API_KEY)
+
+
+PROVIDER_CLIENT_FACTORIES = {
+    "deepgram": _create_deepgram_client,
+    "local_whisper": LocalWhisperPool,
+}
+
+
+def get_provider_client(name: str):
+    client = _provider_clients.get(name)
+    if client is None:
+        with _provider_clients_lock:
+            client = _provider_clients.get(name)
+            if client is None:
+                client = PROVIDER_CLIENT_FACTORIES[name]()
+                _provider_clients[name] = client
+    return client
+
+
+async def preload_provider_clients():
+    loop = asyncio.get_running_loop()
+    for name in TRANSCRIPTION_PRELOAD_PROVIDERS.split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in PROVIDER_CLIENT_FACTORIES:
+            print(f"WARNING: unknown transcription provider client '{name}' in TRANSCRIPTION_PRELOAD_PROVIDERS")
+            continue
+        try:
+            await loop.run_in_executor(_transcription_executor, get_provider_client, name)
+        except Exception as e:
+            print(f"WARNING: could not preload transcription provider client '{name}': {type(e).__name__}: {e}")
+
+
+def transcribe_with_deepgram(
+    audio_content: AudioInput,
+    language: str = "ro",
+    model: str = "nova-3"
+) -> TranscriptionResult:
+    dg = get_provider_client("deepgram")
 
-    dg = DeepgramClient(api_key=DEEPGRAM_API_KEY)
+    if isinstance(audio_content, SpooledAudio):
+        request = audio_content.iter_chunks()
+    else:
+        request = audio_content
 
     response = dg.listen.v1.media.transcribe_file(
-        request=audio_content,
-        model="nova-3",
+        request=request,
+        model=model,
         language=language,
         smart_format=True,
     )
@@ -71,29 +131,25 @@ def transcribe_with_nova3(
 
 
 def transcribe_with_whisper_hosted_api(
-    audio_content: bytes,
+    audio_content: AudioInput,
     language: str = "ro"
 ) -> TranscriptionResult:
     WHISPER_HOSTED_API_URL = "https://sebiflorinp-Whisper-Model-Hosting.hf.space/transcribe"
 
-    audio_file = io.BytesIO(audio_content)
-    data, samplerate = sf.read(audio_file)
+    samples = normalize_audio(audio_content)
 
-    if samplerate != 16000:
-        import resampy
-        data = resampy.resample(data.T, samplerate, 16000)
-        samplerate = 16000
+    with tempfile.TemporaryFile() as audio_file:
+        encode_audio(samples, audio_file)
+        del samples
+        audio_file.seek(0)
 
-    wav_io = io.BytesIO()
-    sf.write(wav_io, data.T, samplerate, format="WAV")
-    wav_io.seek(0)
-
-    files = {"file": ("audio.wav", wav_io.read(), "audio/wav")}
-    response = requests.post(
-        WHISPER_HOSTED_API_URL,
-        files=files,
-        timeout=120
-    )
+        extension = NORMALIZED_AUDIO_FORMAT.lower()
+        files = {"file": (f"audio.{extension}", audio_file, AUDIO_MIME_TYPES[NORMALIZED_AUDIO_FORMAT])}
+        response = get_whisper_hosted_client().post(
+            WHISPER_HOSTED_API_URL,
+            files=files,
+            timeout=120
+        )
     response.raise_for_status()
 
     data = response.json()
@@ -103,23 +159,94 @@ def transcribe_with_whisper_hosted_api(
 
     return TranscriptionResult(text=text)
 
+
+def transcribe_with_local_whisper(
+    audio_content: AudioInput,
+    language: str = "ro"
+) -> TranscriptionResult:
+    pool = get_provider_client("local_whisper")
+
+    if isinstance(audio_content, SpooledAudio):
+        text = pool.transcribe(audio_content.path, language)
+    else:
+        text = pool.transcribe(audio_content, language)
+
+    if not text:
+        raise RuntimeError("Empty transcript from local Whisper")
+
+    return TranscriptionResult(text=text)
+
+
+def transcript_cache_key(audio_content: AudioInput, provider: str, language: str) -> str:
+    if isinstance(audio_content, SpooledAudio):
+        audio_hash = audio_content.sha256
+    else:
+        audio_hash = hashlib.sha256(audio_content).hexdigest()
+    suffix = ":vad" if VAD_ENABLED else ""
+    return f"{audio_hash}:{provider}:{language}{suffix}"
+
+
+TRANSCRIPTION_PROVIDERS = {
+    "deepgram_whisper": partial(transcribe_with_deepgram, model="whisper"),
+    "deepgram_nova-3": partial(transcribe_with_deepgram, model="nova-3"),
+    "whisper_hosted_api": transcribe_with_whisper_hosted_api,
+    "local_whisper": transcribe_with_local_whisper,
+}
+
+
+def cached_transcription_result(cached) -> TranscriptionResult:
+    # Entries written before time maps were cached hold only the text.
+    if isinstance(cached, str):
+        return TranscriptionResult(text=cached)
+    time_map = cached.get("time_map")
+    if time_map is not None:
+        time_map = [TimeMapEntry(*entry) for entry in time_map]
+    return TranscriptionResult(text=cached["text"], time_map=time_map)
+
+
 def transcribe_audio(
-    audio_content: bytes,
+    audio_content: AudioInput,
     provider: str = "deepgram_nova-3",
-    language: str = "ro"
+    language: str = "ro",
+    use_cache: bool = True
 ) -> TranscriptionResult:
 
     print(provider)
     provider = provider.lower()
     print(f"provider: {provider}")
 
-    if provider == "deepgram_whisper":
-        return transcribe_with_whisper_deepgram(audio_content, language)
+    transcribe = TRANSCRIPTION_PROVIDERS.get(provider)
+    if transcribe is None:
+        raise ValueError(f"Unsupported transcription provider: {provider}")
 
-    if provider == "deepgram_nova-3":
-        return transcribe_with_nova3(audio_content, language)
+    cache_key = transcript_cache_key(audio_content, provider, language) if use_cache else None
+    cached = transcript_cache.get(cache_key) if use_cache else None
+    if cached is not None:
+        print("Transcript cache hit")
+        return cached_transcription_result(cached)
 
-    if provider == "whisper_hosted_api":
-        return transcribe_with_whisper_hosted_api(audio_content, language)
+    time_map = None
+    if VAD_ENABLED:
+        audio_content, time_map = trim_audio_for_upload(audio_content)
 
-    raise ValueError(f"Unsupported transcription provider: {provider}")
+    result = transcribe(audio_content, language)
+    result.time_map = time_map
+    if use_cache:
+        transcript_cache.set(cache_key, {
+            "text": result.text,
+            "time_map": [list(entry) for entry in time_map] if time_map is not None else None
+        })
+    return result
+
+
+async def transcribe_audio_async(
+    audio_content: AudioInput,
+    provider: str = "deepgram_nova-3",
+    language: str = "ro",
+    use_cache: bool = True
+) -> TranscriptionResult:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _transcription_executor,
+        partial(transcribe_audio, audio_content, provider, language, use_cache)
+    )
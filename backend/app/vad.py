@@ -0,0 +1,117 @@
+import os
+from typing import NamedTuple, Optional
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "false").lower() in ("1", "true", "yes")
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+# A frame is speech when it is this many dB above the recording's noise floor
+# (10th percentile of frame energy) and above the absolute minimum level.
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "12"))
+VAD_MIN_LEVEL_DB = float(os.getenv("VAD_MIN_LEVEL_DB", "-55"))
+VAD_PADDING_MS = int(os.getenv("VAD_PADDING_MS", "200"))
+VAD_MAX_PAUSE_MS = int(os.getenv("VAD_MAX_PAUSE_MS", "600"))
+VAD_MIN_SAVED_SECONDS = float(os.getenv("VAD_MIN_SAVED_SECONDS", "1.0"))
+
+
+class TimeMapEntry(NamedTuple):
+    processed_start: float
+    original_start: float
+    duration: float
+
+
+class TrimmedAudio(NamedTuple):
+    samples: np.ndarray
+    sample_rate: int
+    original_seconds: float
+    time_map: list
+
+    @property
+    def seconds(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+
+def frame_levels_db(samples: np.ndarray, frame_size: int) -> np.ndarray:
+    frame_count = len(samples) // frame_size
+    frames = samples[:frame_count * frame_size].reshape(frame_count, frame_size)
+    energy = np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame_size
+    return 10.0 * np.log10(energy + 1e-12)
+
+
+def speech_mask(levels_db: np.ndarray, padding_frames: int) -> np.ndarray:
+    threshold = max(np.percentile(levels_db, 10) + VAD_MARGIN_DB, VAD_MIN_LEVEL_DB)
+    mask = levels_db > threshold
+    if padding_frames > 0 and mask.any():
+        # Dilate speech by the padding so word onsets and tails are kept.
+        kernel = np.ones(2 * padding_frames + 1, dtype=np.int32)
+        mask = np.convolve(mask.astype(np.int32), kernel, mode="same") > 0
+    return mask
+
+
+def _runs(mask: np.ndarray) -> list:
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return [(int(start), int(end)) for start, end in zip(edges[::2], edges[1::2])]
+
+
+# Leading and trailing silence is dropped and every internal pause is capped at
+# VAD_MAX_PAUSE_MS. The time map lists, for each kept stretch, where it starts
+# in the processed and in the original audio.
+def trim_silence(samples: np.ndarray, sample_rate: int) -> TrimmedAudio:
+    original_seconds = len(samples) / sample_rate
+    frame_size = max(1, sample_rate * VAD_FRAME_MS // 1000)
+    if len(samples) < frame_size:
+        return TrimmedAudio(samples, sample_rate, original_seconds, [TimeMapEntry(0.0, 0.0, original_seconds)])
+
+    mask = speech_mask(frame_levels_db(samples, frame_size), VAD_PADDING_MS // VAD_FRAME_MS)
+    speech_runs = _runs(mask)
+    if not speech_runs:
+        return TrimmedAudio(samples, sample_rate, original_seconds, [TimeMapEntry(0.0, 0.0, original_seconds)])
+
+    max_pause = sample_rate * VAD_MAX_PAUSE_MS // 1000
+    pieces = []
+    time_map = []
+    processed_samples = 0
+    previous_end = None
+    for start_frame, end_frame in speech_runs:
+        start = start_frame * frame_size
+        end = len(samples) if end_frame == len(mask) else end_frame * frame_size
+        if previous_end is not None:
+            pause = start - previous_end
+            if pause > max_pause:
+                # Keep the capped pause centred, so a run boundary never
+                # cuts into speech.
+                keep_from = previous_end + (pause - max_pause) // 2
+                pieces.append(samples[keep_from:keep_from + max_pause])
+                processed_samples += max_pause
+                start_original = start
+            else:
+                start = previous_end
+                start_original = start
+        else:
+            start_original = start
+        pieces.append(samples[start:end])
+        time_map.append(TimeMapEntry(
+            processed_samples / sample_rate,
+            start_original / sample_rate,
+            (end - start) / sample_rate
+        ))
+        processed_samples += end - start
+        previous_end = end
+
+    return TrimmedAudio(np.concatenate(pieces), sample_rate, original_seconds, time_map)
+
+
+def map_to_original_time(time_map: list, processed_seconds: float) -> float:
+    for entry in reversed(time_map):
+        if processed_seconds >= entry.processed_start:
+            offset = min(processed_seconds - entry.processed_start, entry.duration)
+            return entry.original_start + offset
+    return processed_seconds
+
+
+def time_map_to_dicts(time_map: Optional[list]) -> Optional[list]:
+    if time_map is None:
+        return None
+    return [TimeMapEntry(*entry)._asdict() for entry in time_map]
@@ -0,0 +1,60 @@
+import io
+from math import gcd
+import numpy as np
+import pytest
+import soundfile as sf
+from scipy.signal import resample_poly
+import app.audio_processing as audio_processing
+from app.audio_processing import TARGET_SAMPLE_RATE, normalize_audio, resample_blocks
+
+
+def reference_resample(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    if sample_rate == TARGET_SAMPLE_RATE:
+        return samples
+    divisor = gcd(sample_rate, TARGET_SAMPLE_RATE)
+    return resample_poly(samples, TARGET_SAMPLE_RATE // divisor, sample_rate // divisor)
+
+
+def split(samples: np.ndarray, size: int) -> list:
+    return [samples[start:start + size] for start in range(0, len(samples), size)]
+
+
+# Single-frame blocks make one resample_poly call per decimation step, so
+# they are only run on short signals.
+@pytest.mark.parametrize("sample_rate", [8000, 11025, 16000, 22050, 44100, 48000])
+@pytest.mark.parametrize("length, block_frames", [
+    (length, block_frames)
+    for length in (0, 1, 37, 1000, 50000)
+    for block_frames in (1, 500, 4096, 1 << 18)
+    if block_frames > 1 or length <= 1000
+])
+def test_block_resampling_matches_single_call(sample_rate, length, block_frames):
+    samples = np.random.default_rng(length).standard_normal(length).astype(np.float32)
+
+    pieces = list(resample_blocks(iter(split(samples, 777)), sample_rate, block_frames=block_frames))
+    resampled = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+    expected = reference_resample(samples, sample_rate)
+
+    assert len(resampled) == len(expected)
+    np.testing.assert_allclose(resampled, expected, atol=1e-5)
+
+
+def test_normalize_audio_decodes_in_blocks(monkeypatch):
+    monkeypatch.setattr(audio_processing, "AUDIO_DECODE_BLOCK_FRAMES", 4096)
+    stereo = np.random.default_rng(0).standard_normal((100000, 2)).astype(np.float32) * 0.3
+    buffer = io.BytesIO()
+    sf.write(buffer, stereo, 44100, format="WAV", subtype="FLOAT")
+
+    samples = normalize_audio(buffer.getvalue())
+
+    expected = reference_resample(stereo.mean(axis=1), 44100)
+    assert samples.dtype == np.float32 and samples.flags.c_contiguous
+    assert len(samples) == len(expected)
+    np.testing.assert_allclose(samples, expected, atol=1e-5)
+
+
+def test_normalize_audio_of_empty_file():
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros((0, 1), dtype=np.float32), 44100, format="WAV")
+
+    assert len(normalize_audio(buffer.getvalue())) == 0
@@ -0,0 +1,57 @@
+import json
+import os
+import pytest
+import app.local_extraction as local_extraction
+from app.form_schemas import FORM_SCHEMAS
+from app.local_extraction import extract_fields_locally
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "echo_dictations.json")
+ECHO_FIELDS = list(FORM_SCHEMAS["echocardiography"])
+
+# Values written locally are never checked by the LLM, so wrong values must
+# stay rare; fields the matchers cannot read are fine, they go to the LLM.
+MIN_LOCAL_ACCURACY = 0.95
+MIN_LOCAL_COVERAGE = 0.85
+
+with open(CORPUS_PATH, encoding="utf-8") as f:
+    CORPUS = json.load(f)
+
+
+@pytest.fixture(autouse=True)
+def send_absent_fields_to_llm(monkeypatch):
+    monkeypatch.setattr(local_extraction, "LOCAL_EXTRACTION_TRUST_ABSENT", False)
+
+
+def run_corpus() -> list:
+    return [
+        (case, *extract_fields_locally("echocardiography", case["transcript"], ECHO_FIELDS))
+        for case in CORPUS
+    ]
+
+
+def test_local_accuracy_and_coverage():
+    extracted = correct = expected_total = 0
+    for case, values, _ in run_corpus():
+        expected = case["expected"]
+        expected_total += len(expected)
+        extracted += len(values)
+        correct += sum(1 for field, value in values.items() if expected.get(field) == value)
+
+    accuracy = correct / extracted
+    coverage = correct / expected_total
+    print(f"echo corpus: {len(CORPUS)} dictations, accuracy {accuracy:.3f}, coverage {coverage:.3f}")
+    assert accuracy >= MIN_LOCAL_ACCURACY
+    assert coverage >= MIN_LOCAL_COVERAGE
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=lambda case: case["transcript"][:40])
+def test_no_value_for_fields_not_dictated(case):
+    values, _ = extract_fields_locally("echocardiography", case["transcript"], ECHO_FIELDS)
+    assert set(values) <= set(case["expected"])
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=lambda case: case["transcript"][:40])
+def test_fields_sent_to_llm(case):
+    values, unresolved = extract_fields_locally("echocardiography", case["transcript"], ECHO_FIELDS)
+    assert unresolved == case["llm_fields"]
+    assert set(values) | set(unresolved) == set(ECHO_FIELDS)
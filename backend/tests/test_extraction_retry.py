@@ -0,0 +1,59 @@
+import asyncio
+import app.extraction as extraction
+import app.extraction_backends as extraction_backends
+from app.cache import build_tiered_cache
+from app.extraction_backends import ExtractionBackend
+
+FIELDS = ["plangere principala", "diagnostic"]
+
+
+class ScriptedBackend(ExtractionBackend):
+    name = "scripted"
+    model_id = "scripted"
+
+    def __init__(self, responses: list):
+        self.responses = list(responses)
+        self.prompts = []
+
+    async def complete(self, messages: list, max_tokens: int, on_delta=None) -> str:
+        self.prompts.append(messages[-1]["content"])
+        return self.responses.pop(0)
+
+
+def run_extraction(monkeypatch, responses: list, fields: list = FIELDS):
+    backend = ScriptedBackend(responses)
+    cache = build_tiered_cache(max_entries=16, ttl_seconds=0)
+    monkeypatch.setattr(extraction_backends, "_extraction_backend", backend)
+    monkeypatch.setattr(extraction, "extraction_cache", cache)
+    result = asyncio.run(extraction.extract_fields("plangere principala durere", fields, "medical-report"))
+    return result, backend, cache
+
+
+def test_truncated_reply_with_only_unknown_keys_is_split(monkeypatch):
+    result, backend, cache = run_extraction(monkeypatch, [
+        '{"plângere principală": "durere", "diagnos',
+        '{"plangere principala": "durere"}',
+        '{"diagnostic": null}',
+    ])
+
+    assert result == {"plangere principala": "durere", "diagnostic": ""}
+    assert len(backend.prompts) == 3
+    assert cache.stats()["memory"]["entries"] == 2
+
+
+def test_truncated_reply_is_not_cached(monkeypatch):
+    result, backend, cache = run_extraction(monkeypatch, [
+        '{"plangere principala": "durere", "diagnostic": "HT',
+        '{"diagnostic": "HTA"}',
+    ])
+
+    assert result == {"plangere principala": "durere", "diagnostic": "HTA"}
+    assert '"plangere principala":' not in backend.prompts[1]
+    assert cache.stats()["memory"]["entries"] == 1
+
+
+def test_truncated_single_field_reply_returns(monkeypatch):
+    result, backend, _ = run_extraction(monkeypatch, ['{"plângere": "durere", "diagnos'], ["diagnostic"])
+
+    assert result == {"diagnostic": ""}
+    assert len(backend.prompts) == 1
@@ -0,0 +1,136 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from google.api_core.exceptions import Aborted
+import app.firestore_helpers as firestore_helpers
+from app.firestore_helpers import IdAllocator
+
+
+# In-memory counters with optimistic transactions: a commit aborts when a
+# document it read has been written since, and the client retries it.
+class FakeCounterStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.versions = {}
+        self.reservations = 0
+        self.aborts = 0
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+
+class FakeCollection:
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    def document(self, document_id):
+        return FakeCounterRef(self.store, f"{self.name}/{document_id}")
+
+
+class FakeSnapshot:
+    def __init__(self, data):
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeCounterRef:
+    def __init__(self, store, path):
+        self.store = store
+        self.path = path
+
+    def get(self, transaction=None):
+        with self.store.lock:
+            data = self.store.values.get(self.path)
+            if transaction is not None:
+                transaction.reads[self.path] = self.store.versions.get(self.path, 0)
+            return FakeSnapshot(dict(data) if data is not None else None)
+
+
+class FakeTransaction:
+    _read_only = False
+    _max_attempts = 10000
+
+    def __init__(self, store):
+        self.store = store
+        self._id = None
+        self._clean_up()
+
+    def _clean_up(self):
+        self.reads = {}
+        self.writes = {}
+
+    def _begin(self, retry_id=None):
+        self._id = object()
+
+    def set(self, reference, data, merge=False):
+        self.writes[reference.path] = (data, merge)
+
+    def _commit(self):
+        # Widens the window between read and commit so transactions collide.
+        time.sleep(0.001)
+        with self.store.lock:
+            for path, version in self.reads.items():
+                if self.store.versions.get(path, 0) != version:
+                    self.store.aborts += 1
+                    raise Aborted("counter changed")
+            for path, (data, merge) in self.writes.items():
+                current = self.store.values.get(path, {}) if merge else {}
+                self.store.values[path] = {**current, **data}
+                self.store.versions[path] = self.store.versions.get(path, 0) + 1
+            self.store.reservations += 1
+
+    def _rollback(self):
+        self._clean_up()
+
+
+def test_concurrent_allocators_never_repeat_ids(monkeypatch):
+    store = FakeCounterStore()
+    monkeypatch.setattr(firestore_helpers, "get_firestore_db", lambda: store)
+
+    block_size = 7
+    allocators = [IdAllocator(block_size=block_size) for _ in range(4)]
+    collections = ["patients", "medical_reports"]
+    calls_per_thread = 150
+
+    def allocate(worker):
+        allocator = allocators[worker % len(allocators)]
+        collection_name = collections[worker % len(collections)]
+        return collection_name, [allocator.next_id(collection_name) for _ in range(calls_per_thread)]
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        results = list(executor.map(allocate, range(32)))
+
+    ids_by_collection = {name: [] for name in collections}
+    for collection_name, ids in results:
+        ids_by_collection[collection_name].extend(ids)
+
+    blocks = 0
+    for collection_name, ids in ids_by_collection.items():
+        assert len(ids) == 16 * calls_per_thread
+        assert len(set(ids)) == len(ids)
+        reserved_blocks = {(allocated - 1) // block_size for allocated in ids}
+        counter = store.values[f"_counters/{collection_name}"]["count"]
+        # Every reserved block was handed out, and the counter moved once per block.
+        assert counter == len(reserved_blocks) * block_size
+        assert max(reserved_blocks) == len(reserved_blocks) - 1
+        blocks += len(reserved_blocks)
+
+    assert store.reservations == blocks
+    assert store.aborts > 0
+
+
+def test_ids_within_one_allocator_are_sequential(monkeypatch):
+    store = FakeCounterStore()
+    monkeypatch.setattr(firestore_helpers, "get_firestore_db", lambda: store)
+
+    allocator = IdAllocator(block_size=5)
+    assert [allocator.next_id("patients") for _ in range(12)] == list(range(1, 13))
+    assert store.reservations == 3
@@ -0,0 +1,94 @@
+import pytest
+from app.json_stream import IncrementalJSONParser, parse_json_object
+
+
+def test_fenced_output():
+    text = '```json\n{"diagnosis": "HTA", "treatment": "repaus"}\n```'
+    assert parse_json_object(text) == ({"diagnosis": "HTA", "treatment": "repaus"}, True)
+
+
+def test_output_with_surrounding_prose():
+    text = 'Here is the JSON:\n{"diagnosis": "HTA"}\nLet me know if you need anything else.'
+    assert parse_json_object(text) == ({"diagnosis": "HTA"}, True)
+
+
+def test_missing_comma():
+    values, complete = parse_json_object('{"a": "x" "b": "y", "c": 3 "d": true}')
+    assert values == {"a": "x", "b": "y", "c": 3, "d": True}
+    assert complete
+
+
+def test_trailing_comma():
+    assert parse_json_object('{"a": "x", "b": 2,}') == ({"a": "x", "b": 2}, True)
+
+
+def test_escaped_quotes():
+    values, complete = parse_json_object('{"a": "he said \\"stop\\"", "b": "x\\\\"}')
+    assert values == {"a": 'he said "stop"', "b": "x\\"}
+    assert complete
+
+
+def test_noise_between_pairs_is_skipped():
+    values, complete = parse_json_object('{"a": "x", note "b": "y"')
+    assert values == {"a": "x", "b": "y"}
+    assert not complete
+
+
+def test_truncated_mid_string():
+    values, complete = parse_json_object('{"a": "complete", "b": "cut of')
+    assert values == {"a": "complete"}
+    assert not complete
+
+
+def test_truncated_mid_number():
+    values, complete = parse_json_object('{"a": "x", "b": 12')
+    assert values == {"a": "x"}
+    assert not complete
+
+
+def test_truncated_mid_key():
+    values, complete = parse_json_object('{"a": 1, "lon')
+    assert values == {"a": 1}
+    assert not complete
+
+
+def test_no_object():
+    assert parse_json_object("Sorry, I cannot help with that.") == (None, False)
+    assert parse_json_object("") == (None, False)
+
+
+def test_nested_values_are_kept_whole():
+    values, complete = parse_json_object('{"a": {"b": [1, "}"]}, "c": "d"')
+    assert values == {"a": {"b": [1, "}"]}, "c": "d"}
+    assert not complete
+
+
+STREAMED_OUTPUTS = [
+    '```json\n{"aorta": "32 mm", "as": 40, "vd": "normal", "note": "a \\"b\\" c"}\n```',
+    'Sure: {"a": "x" "b": 12, "c": [1, 2], "d": null,}',
+    '{"a": "x", "b": "unfinished',
+]
+
+
+@pytest.mark.parametrize("text", STREAMED_OUTPUTS)
+def test_char_by_char_feed_matches_single_feed(text):
+    whole = IncrementalJSONParser()
+    whole_pairs = whole.feed(text)
+
+    streamed = IncrementalJSONParser()
+    streamed_pairs = []
+    for character in text:
+        streamed_pairs.extend(streamed.feed(character))
+
+    assert streamed_pairs == whole_pairs
+    assert streamed.values == whole.values
+    assert streamed.complete == whole.complete
+
+
+def test_pairs_are_reported_once_as_they_complete():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"a": "x", "b": 1') == [("a", "x")]
+    assert parser.feed("2") == []
+    assert parser.feed(", ") == [("b", 12)]
+    assert parser.feed("}") == []
+    assert parser.complete
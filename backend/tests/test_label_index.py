@@ -0,0 +1,58 @@
+import pytest
+from app.form_schemas import FORM_SCHEMAS
+from app.label_index import FuzzyLabelIndex, get_label_index, is_label_misspelling
+from app.local_extraction import extract_fields_locally
+
+ECHO_FIELDS = list(FORM_SCHEMAS["echocardiography"])
+
+
+@pytest.mark.parametrize("transcript", [
+    "aorta descendenta 20 mm",
+    "aorta descendente 20 mm",
+    "ventricul stang 40 mm",
+    "ventriculul stang 40 mm",
+    "atriu drept 35 mm",
+    "atriul dreapta 35 mm",
+])
+def test_other_anatomy_is_not_a_label(transcript):
+    values, unresolved = extract_fields_locally("echocardiography", transcript, ECHO_FIELDS)
+    assert values == {}
+    assert unresolved == ECHO_FIELDS
+
+
+@pytest.mark.parametrize("transcript, field", [
+    ("aorta ascedenta 30 mm", "aorta ascendenta"),
+    ("ventricull drept 25 mm", "ventricul drept"),
+    ("atriu stamg 38 mm", "atriu stang"),
+])
+def test_misspelled_label_is_matched(transcript, field):
+    values, _ = extract_fields_locally("echocardiography", transcript, ECHO_FIELDS)
+    assert field in values
+
+
+# With a permissive cutoff the score alone lets these through; the word
+# checks must still reject them.
+@pytest.mark.parametrize("transcript", [
+    "aorta descendenta",
+    "ventricul stang",
+    "atriu drept",
+    "aorta la nivel",
+])
+def test_word_checks_reject_near_misses_at_low_cutoff(transcript):
+    index = FuzzyLabelIndex(ECHO_FIELDS, score_cutoff=60)
+    assert index.find_labels(transcript) == []
+
+
+def test_label_misspelling_rules():
+    assert is_label_misspelling("aorta ascedenta", "aorta ascendenta")
+    assert not is_label_misspelling("aorta descendenta", "aorta ascendenta")
+    assert not is_label_misspelling("vetricul stang", "atriu stang")
+    assert not is_label_misspelling("atriu dreapta", "atriu stang")
+
+
+def test_fuzzy_label_offsets_point_into_transcript():
+    transcript = "Aorta ascedentă 30 mm"
+    labels = get_label_index("echocardiography").find_labels(transcript)
+    assert [(field, transcript[start:end]) for field, start, end in labels] == [
+        ("aorta ascendenta", "Aorta ascedentă")
+    ]
@@ -0,0 +1,98 @@
+import json
+import time
+import asyncio
+import httpx
+import pytest
+import app.database as database
+import app.extraction as extraction
+import app.extraction_backends as extraction_backends
+import app.http_clients as http_clients
+import app.transcription as transcription
+from app.cache import build_tiered_cache
+from app.extraction_backends import RouterBackend
+from app.transcription import TranscriptionResult
+
+LLM_URL = "http://llm.test/v1/chat/completions"
+RECORDINGS = 24
+TRANSCRIPTION_SECONDS = 0.5
+LLM_SECONDS = 0.5
+FIELDS = ["diagnostic", "tratament"]
+
+
+# Stand-ins for the vendors: transcription blocks its thread like the
+# Deepgram SDK does, the LLM router answers after a delay like a slow model.
+def slow_transcription(audio_content, language):
+    time.sleep(TRANSCRIPTION_SECONDS)
+    return TranscriptionResult(text=f"Diagnostic HTA. Tratament repaus. {audio_content.sha256[:8]}")
+
+
+async def slow_llm(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(LLM_SECONDS)
+    content = json.dumps({"diagnostic": "HTA", "tratament": "repaus"})
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+@pytest.fixture
+def app_under_load(monkeypatch):
+    monkeypatch.setattr(database, "check_and_init_db", lambda: None)
+    import app.main as main
+    monkeypatch.setitem(transcription.TRANSCRIPTION_PROVIDERS, "stub", slow_transcription)
+    monkeypatch.setattr(transcription, "transcript_cache", build_tiered_cache(max_entries=64, ttl_seconds=0))
+    monkeypatch.setattr(extraction, "extraction_cache", build_tiered_cache(max_entries=64, ttl_seconds=0))
+    monkeypatch.setattr(extraction_backends, "_extraction_backend", RouterBackend(url=LLM_URL, token="test", stream=False))
+    monkeypatch.setattr(http_clients, "_llm_router_client", httpx.AsyncClient(transport=httpx.MockTransport(slow_llm)))
+    return main.app
+
+
+async def post_recording(client: httpx.AsyncClient, index: int) -> httpx.Response:
+    return await client.post(
+        "/api/process-recording",
+        files={"audio_file": (f"{index}.wav", f"audio {index}".encode("utf-8"), "audio/wav")},
+        data={
+            "fields_json": json.dumps({"fields": FIELDS}),
+            "form_type": "medical-report",
+            "transcription_provider": "stub"
+        }
+    )
+
+
+async def probe_health(client: httpx.AsyncClient, until: asyncio.Event) -> list:
+    latencies = []
+    while not until.is_set():
+        started = time.perf_counter()
+        response = await client.get("/health")
+        assert response.status_code == 200
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.02)
+    return latencies
+
+
+async def run_load(app) -> tuple:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app.test") as client:
+        done = asyncio.Event()
+        health = asyncio.create_task(probe_health(client, done))
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(post_recording(client, index) for index in range(RECORDINGS)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        return responses, elapsed, await health
+
+
+def test_recordings_run_concurrently_and_health_stays_responsive(app_under_load):
+    responses, elapsed, health_latencies = asyncio.run(run_load(app_under_load))
+
+    assert all(response.status_code == 200 for response in responses)
+    assert all(response.json()["parsed_json"] == {"diagnostic": "HTA", "tratament": "repaus"} for response in responses)
+
+    serial_seconds = RECORDINGS * (TRANSCRIPTION_SECONDS + LLM_SECONDS)
+    print(
+        f"{RECORDINGS} recordings in {elapsed:.2f}s (serial {serial_seconds:.1f}s), "
+        f"{RECORDINGS / elapsed:.1f} recordings/s, "
+        f"/health max {max(health_latencies) * 1000:.0f} ms over {len(health_latencies)} probes"
+    )
+    # All recordings overlap: the batch takes about one recording's time.
+    assert elapsed < serial_seconds / 4
+    # A blocked event loop would hold /health for a whole vendor call.
+    assert len(health_latencies) >= 5
+    assert max(health_latencies) < TRANSCRIPTION_SECONDS / 2
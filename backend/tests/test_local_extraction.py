@@ -0,0 +1,99 @@
+import pytest
+from app.local_extraction import parse_measurement
+from app.segmenter import TranscriptSegmenter, label_variants, normalize_for_matching
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("22 mm", "22 mm"),
+    ("2,3 cm", "2,3 cm"),
+    ("2.8 cm", "2.8 cm"),
+    ("22", "22"),
+    ("doi milimetri", "2 milimetri"),
+    ("doisprezece mm", "12 mm"),
+    ("douăzeci și doi", "22"),
+    ("treizeci și patru de milimetri", "34 milimetri"),
+    ("cincizeci", "50"),
+])
+def test_digits_and_number_words(text, expected):
+    assert parse_measurement(text) == expected
+
+
+def test_number_with_unit_wins_over_bare_number():
+    assert parse_measurement("grad 2, diametru 45 mm") == "45 mm"
+
+
+def test_digits_win_over_number_words():
+    assert parse_measurement("doi, apoi 22") == "22"
+    assert parse_measurement("doi milimetri sau 22 milimetri") == "22 milimetri"
+
+
+def test_numbers_inside_words_or_decimals_are_not_split():
+    assert parse_measurement("V2 normal") == ""
+    assert parse_measurement("1,25 cm") == "1,25 cm"
+
+
+def test_unit_within_window_is_attached():
+    assert parse_measurement("47 de milimetri") == "47 milimetri"
+    assert parse_measurement("treizeci si unu de milimetri") == "31 milimetri"
+
+
+def test_unit_outside_window_is_not_attached():
+    assert parse_measurement("22, fara alte modificari, cm") == "22"
+
+
+def test_window_cut_does_not_invent_a_unit():
+    assert parse_measurement("de aproximativ 3 ori mai mare decat normal, 45 mm") == "45 mm"
+    assert parse_measurement("3 mai") == "3"
+
+
+def test_late_bare_number_is_ignored():
+    assert parse_measurement("dilatat, fara semne de hipertrofie, in segmentul 4") == ""
+
+
+def test_unit_keeps_original_spelling():
+    assert parse_measurement("  Doisprezece  MM") == "12 MM"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Atriu stâng", "atriu stang"),
+    ("ȘŞȚŢĂÂÎ", "ssttaai"),
+    ("Aortă Ascendentă", "aorta ascendenta"),
+])
+def test_diacritics_are_folded(text, expected):
+    assert normalize_for_matching(text) == expected
+
+
+def test_normalized_offsets_match_original():
+    text = "İnel Ăorta ﬁ atriu stâng"
+    normalized = normalize_for_matching(text)
+    assert len(normalized) == len(text)
+    start = normalized.index("atriu stang")
+    assert text[start:start + len("atriu stang")] == "atriu stâng"
+
+
+def test_label_variants_cover_articles():
+    assert label_variants("ventricul drept") == {"ventricul drept", "ventriculul drept", "ventriculului drept"}
+    assert label_variants("atriu stang") == {"atriu stang", "atriul stang", "atriului stang"}
+
+
+def test_segmenter_spans_follow_labels():
+    segmenter = TranscriptSegmenter(["aorta la inel", "atriu stang", "as"])
+    transcript = "Aorta la inel 22 mm, atriul  stâng 40 mm, AS 40"
+    spans = segmenter.segment(transcript)
+    assert [(span.field, transcript[span.value_start:span.value_end]) for span in spans] == [
+        ("aorta la inel", " 22 mm, "),
+        ("atriu stang", " 40 mm, "),
+        ("as", " 40"),
+    ]
+    assert transcript[spans[1].label_start:spans[1].label_end] == "atriul  stâng"
+
+
+def test_segmenter_ignores_labels_inside_words():
+    segmenter = TranscriptSegmenter(["as"])
+    assert segmenter.find_labels("aspect normal, basal") == []
+
+
+def test_first_spans_keep_first_occurrence():
+    segmenter = TranscriptSegmenter(["vd"])
+    spans = segmenter.first_spans("VD 24, apoi VD 26")
+    assert spans["vd"].value_start == 2
@@ -0,0 +1,181 @@
+import asyncio
+import random
+import pytest
+from firebase_admin import firestore
+import app.patient_documents as patient_documents
+from app.firestore_helpers import PATIENT_DOCUMENT_COLLECTIONS
+from app.pagination import PageParams, decode_cursor, fetch_page
+from app.patient_documents import get_patient_timeline
+
+# Few distinct timestamps, so most pages start or end inside a tie.
+TIMESTAMPS = [f"2026-01-0{day}T10:00:00" for day in range(1, 5)]
+
+
+class FakeReference:
+    def __init__(self, collection_name, document_id):
+        self.parent = FakeParent(collection_name)
+        self.id = document_id
+
+
+class FakeParent:
+    def __init__(self, collection_name):
+        self.id = collection_name
+
+
+class FakeSnapshot:
+    exists = True
+
+    def __init__(self, collection_name, document_id, data):
+        self.id = document_id
+        self.reference = FakeReference(collection_name, document_id)
+        self._data = data
+
+    def get(self, field):
+        return self._data[field]
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+# Firestore query semantics the pagination relies on: equality filters,
+# descending order_by, start_at/start_after with a cursor covering a prefix
+# of the order fields, and limit.
+class FakeQuery:
+    def __init__(self, snapshots, filters=(), orders=(), cursor=None, limit_count=None):
+        self.snapshots = snapshots
+        self.filters = filters
+        self.orders = orders
+        self.cursor = cursor
+        self.limit_count = limit_count
+
+    def _copy(self, **changes):
+        state = dict(filters=self.filters, orders=self.orders, cursor=self.cursor, limit_count=self.limit_count)
+        state.update(changes)
+        return FakeQuery(self.snapshots, **state)
+
+    def where(self, field, op, value):
+        assert op == "=="
+        return self._copy(filters=self.filters + ((field, value),))
+
+    def order_by(self, field, direction):
+        assert direction == firestore.Query.DESCENDING
+        return self._copy(orders=self.orders + (field,))
+
+    def start_at(self, values):
+        return self._copy(cursor=(values, True))
+
+    def start_after(self, values):
+        return self._copy(cursor=(values, False))
+
+    def limit(self, count):
+        return self._copy(limit_count=count)
+
+    def _key(self, snapshot, fields):
+        return tuple(snapshot.id if field == "__name__" else snapshot.get(field) for field in fields)
+
+    def stream(self):
+        matching = [
+            snapshot for snapshot in self.snapshots
+            if all(snapshot.get(field) == value for field, value in self.filters)
+        ]
+        matching.sort(key=lambda snapshot: self._key(snapshot, self.orders), reverse=True)
+        if self.cursor is not None:
+            values, inclusive = self.cursor
+            fields = self.orders[:len(values)]
+            assert set(fields) == set(values)
+            position = tuple(values[field] for field in fields)
+            matching = [
+                snapshot for snapshot in matching
+                if self._key(snapshot, fields) < position or (inclusive and self._key(snapshot, fields) == position)
+            ]
+        return iter(matching[:self.limit_count])
+
+
+class FakeDatabase:
+    def __init__(self, collections):
+        self.collections = collections
+
+    def collection(self, name):
+        return FakeQuery(self.collections.get(name, []))
+
+
+def make_snapshots(collection_name, count, rng, **fields):
+    return [
+        FakeSnapshot(collection_name, str(document_id), {"created_at": rng.choice(TIMESTAMPS), **fields})
+        for document_id in range(1, count + 1)
+    ]
+
+
+def fetch_all_pages(fetch, limit):
+    items, cursor = [], None
+    while True:
+        page_items, next_cursor = fetch(PageParams(limit, cursor))
+        items.extend(page_items)
+        assert len(page_items) <= limit
+        if next_cursor is None:
+            return items
+        cursor = decode_cursor(next_cursor)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 25, 100])
+def test_list_pages_cover_every_document_once(limit):
+    rng = random.Random(limit)
+    snapshots = make_snapshots("patients", 37, rng, doctor_id=1) + make_snapshots("other", 5, rng, doctor_id=2)
+    query = FakeQuery(snapshots).where("doctor_id", "==", 1)
+
+    documents = fetch_all_pages(lambda page: fetch_page(query, page), limit)
+
+    expected = sorted(
+        (snapshot for snapshot in snapshots if snapshot.get("doctor_id") == 1),
+        key=lambda snapshot: (snapshot.get("created_at"), snapshot.id),
+        reverse=True
+    )
+    assert [document["id"] for document in documents] == [int(snapshot.id) for snapshot in expected]
+
+
+@pytest.fixture
+def timeline_db(monkeypatch):
+    rng = random.Random(7)
+    collections = {
+        collection_name: make_snapshots(collection_name, rng.randint(0, 9), rng, patient_id=1)
+        + make_snapshots(collection_name, 2, rng, patient_id=2)
+        for collection_name in PATIENT_DOCUMENT_COLLECTIONS
+    }
+    # Every collection reuses IDs from 1 and the same few timestamps, so
+    # timeline ties across collections are common.
+    monkeypatch.setattr(patient_documents, "get_firestore_db", lambda: FakeDatabase(collections))
+    return collections
+
+
+def expected_timeline(collections, document_types=None):
+    entries = [
+        (snapshot.get("created_at"), collection_name, snapshot.id)
+        for collection_name, snapshots in collections.items()
+        if not document_types or collection_name in document_types
+        for snapshot in snapshots
+        if snapshot.get("patient_id") == 1
+    ]
+    return [(collection_name, int(document_id)) for _, collection_name, document_id in sorted(entries, reverse=True)]
+
+
+def fetch_timeline(limit, document_types=None):
+    def fetch(page):
+        result = asyncio.run(get_patient_timeline(1, page, document_types))
+        return result["documents"], result["next_cursor"]
+
+    return [(document["document_type"], document["id"]) for document in fetch_all_pages(fetch, limit)]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 8, 50])
+def test_timeline_pages_cover_every_document_once(timeline_db, limit):
+    documents = fetch_timeline(limit)
+
+    assert len(documents) == len(set(documents))
+    assert documents == expected_timeline(timeline_db)
+
+
+@pytest.mark.parametrize("limit", [1, 4])
+def test_filtered_timeline_pages(timeline_db, limit):
+    document_types = ["medical_reports", "prescription_forms"]
+
+    assert fetch_timeline(limit, document_types) == expected_timeline(timeline_db, document_types)
@@ -0,0 +1,156 @@
+import json
+import asyncio
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+import app.database as database
+import app.extraction as extraction
+import app.extraction_backends as extraction_backends
+import app.http_clients as http_clients
+from app.cache import build_tiered_cache
+from app.extraction_backends import RouterBackend
+from app.form_schemas import FORM_SCHEMAS
+from app.streaming import StreamingExtractionSession
+
+LLM_URL = "http://llm.test/v1/chat/completions"
+FORM_TYPE = "medical-report"
+FIELDS = ["diagnostic", "tratament"]
+
+
+def sse_event(delta: str) -> bytes:
+    payload = {"choices": [{"delta": {"content": delta}}]}
+    return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+
+def tokens(text: str, size: int = 3) -> list:
+    return [text[index:index + size] for index in range(0, len(text), size)]
+
+
+# Fake OpenAI-compatible endpoint: each request is answered by the next
+# scripted list of deltas; a None entry cuts the connection at that point.
+class FakeLLMRouter:
+    def __init__(self, responses: list):
+        self.responses = list(responses)
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        deltas = self.responses.pop(0)
+
+        async def stream():
+            for delta in deltas:
+                if delta is None:
+                    raise httpx.RemoteProtocolError("peer closed connection")
+                yield sse_event(delta)
+            yield b"data: [DONE]\n\n"
+
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=stream())
+
+
+@pytest.fixture
+def app_client(monkeypatch):
+    monkeypatch.setattr(database, "check_and_init_db", lambda: None)
+    import app.main as main
+    monkeypatch.setattr(extraction, "extraction_cache", build_tiered_cache(max_entries=16, ttl_seconds=0))
+    monkeypatch.setattr(extraction_backends, "_extraction_backend", RouterBackend(url=LLM_URL, token="test", stream=True))
+
+    def use_router(router: FakeLLMRouter):
+        monkeypatch.setattr(
+            http_clients, "_llm_router_client",
+            httpx.AsyncClient(transport=httpx.MockTransport(router.handler))
+        )
+
+    return TestClient(main.app), use_router
+
+
+def run_stream_session(client: TestClient) -> list:
+    messages = []
+    with client.websocket_connect("/api/process-recording/stream") as websocket:
+        websocket.send_json({"fields": FIELDS, "form_type": FORM_TYPE, "transcription_provider": "fake"})
+        assert websocket.receive_json()["type"] == "ready"
+        websocket.send_bytes("Diagnostic".encode("utf-8"))
+        websocket.send_text(json.dumps({"type": "stop"}))
+        while True:
+            message = websocket.receive_json()
+            if message["type"] == "partial_transcript":
+                continue
+            messages.append(message)
+            if message["type"] in ("final", "error"):
+                return messages
+
+
+def test_fields_are_sent_before_final(app_client):
+    client, use_router = app_client
+    router = FakeLLMRouter([tokens('{"diagnostic": "HTA grad 2", "tratament": "repaus"}')])
+    use_router(router)
+
+    messages = run_stream_session(client)
+
+    assert [message["type"] for message in messages] == ["field", "field", "final"]
+    assert [(message["field"], message["value"]) for message in messages[:2]] == [
+        ("diagnostic", "HTA grad 2"),
+        ("tratament", "repaus"),
+    ]
+    assert messages[-1]["parsed_json"] == {"diagnostic": "HTA grad 2", "tratament": "repaus"}
+    assert messages[-1]["time_map"] is None
+    assert router.requests[0]["stream"] is True
+    # The predefined medical-report schema is used, not the generated one.
+    prompt = router.requests[0]["messages"][-1]["content"]
+    assert FORM_SCHEMAS[FORM_TYPE]["diagnostic"] in prompt
+    assert "dimensiunea in mm" not in prompt
+
+
+def test_cut_off_stream_keeps_completed_pairs(app_client):
+    client, use_router = app_client
+    router = FakeLLMRouter([
+        tokens('{"diagnostic": "HTA grad 2", "tratament": "rep') + [None],
+        tokens('{"tratament": "repaus"}'),
+    ])
+    use_router(router)
+
+    messages = run_stream_session(client)
+
+    assert messages[0] == {"type": "field", "field": "diagnostic", "value": "HTA grad 2"}
+    assert messages[-1]["type"] == "final"
+    assert messages[-1]["parsed_json"] == {"diagnostic": "HTA grad 2", "tratament": "repaus"}
+    # Only the field that was cut off is asked for again.
+    assert len(router.requests) == 2
+    retry_prompt = router.requests[1]["messages"][-1]["content"]
+    assert '"tratament":' in retry_prompt and '"diagnostic":' not in retry_prompt
+
+
+def test_partial_extraction_bypasses_cache(app_client):
+    _, use_router = app_client
+    router = FakeLLMRouter([tokens('{"diagnostic": "HTA"}')] * 2)
+    use_router(router)
+
+    async def extract_twice():
+        for _ in range(2):
+            await extraction.parse_transcript_with_llm("Diagnostic HTA", FIELDS, FORM_TYPE, use_cache=False)
+
+    asyncio.run(extract_twice())
+
+    assert len(router.requests) == 2
+    assert extraction.extraction_cache.stats()["memory"]["entries"] == 0
+
+
+def test_session_extracts_partials_without_cache():
+    calls = []
+
+    async def parse_fn(text, fields, form_type, on_field=None, use_cache=True):
+        calls.append((text, use_cache))
+        return {"diagnostic": text}
+
+    async def send_json(message):
+        pass
+
+    async def run_session():
+        session = StreamingExtractionSession(parse_fn, send_json, FIELDS, FORM_TYPE)
+        await session.on_partial("Diagnostic HTA", "Diagnostic")
+        await asyncio.sleep(0)
+        await session.finish("Diagnostic HTA")
+
+    asyncio.run(run_session())
+
+    assert calls == [("Diagnostic", False), ("Diagnostic HTA", True)]
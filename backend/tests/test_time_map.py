@@ -0,0 +1,77 @@
+import pytest
+from fastapi.testclient import TestClient
+import app.database as database
+import app.transcription as transcription
+from app.cache import build_tiered_cache
+from app.transcription import TranscriptionResult
+from app.vad import TimeMapEntry
+
+TIME_MAP = [TimeMapEntry(0.0, 1.5, 2.0), TimeMapEntry(2.0, 5.0, 3.25)]
+TIME_MAP_JSON = [
+    {"processed_start": 0.0, "original_start": 1.5, "duration": 2.0},
+    {"processed_start": 2.0, "original_start": 5.0, "duration": 3.25},
+]
+
+
+@pytest.fixture
+def stub_provider(monkeypatch, tmp_path):
+    calls = []
+
+    def transcribe(audio_content, language):
+        calls.append(audio_content)
+        return TranscriptionResult(text="atriu stang 40 mm")
+
+    monkeypatch.setitem(transcription.TRANSCRIPTION_PROVIDERS, "stub", transcribe)
+    monkeypatch.setattr(transcription, "VAD_ENABLED", True)
+    monkeypatch.setattr(transcription, "trim_audio_for_upload", lambda audio_content: (b"trimmed", list(TIME_MAP)))
+    monkeypatch.setattr(transcription, "transcript_cache", build_tiered_cache(
+        max_entries=16, ttl_seconds=0, directory=str(tmp_path), max_bytes=1024 * 1024
+    ))
+    return calls
+
+
+def test_cache_hit_keeps_time_map(stub_provider):
+    first = transcription.transcribe_audio(b"audio", "stub")
+    second = transcription.transcribe_audio(b"audio", "stub")
+
+    assert len(stub_provider) == 1
+    assert first.time_map == TIME_MAP
+    assert second.time_map == TIME_MAP
+    assert all(isinstance(entry, TimeMapEntry) for entry in second.time_map)
+
+
+def test_disk_tier_keeps_time_map(stub_provider):
+    transcription.transcribe_audio(b"audio", "stub")
+    transcription.transcript_cache.memory.clear()
+
+    result = transcription.transcribe_audio(b"audio", "stub")
+
+    assert len(stub_provider) == 1
+    assert result.time_map == TIME_MAP
+
+
+def test_legacy_text_entry_has_no_time_map():
+    assert transcription.cached_transcription_result("atriu stang") == TranscriptionResult(text="atriu stang")
+
+
+def test_process_recording_returns_time_map(monkeypatch):
+    monkeypatch.setattr(database, "check_and_init_db", lambda: None)
+    import app.main as main
+
+    async def transcribe_audio_async(audio_content, provider, language):
+        return TranscriptionResult(text="atriu stang 40 mm", time_map=list(TIME_MAP))
+
+    async def parse_transcript(raw_transcript, target_fields, form_type=None, on_field=None, use_cache=True):
+        return {"atriu stang": "40 mm"}
+
+    monkeypatch.setattr(main, "transcribe_audio_async", transcribe_audio_async)
+    monkeypatch.setattr(main, "parse_transcript", parse_transcript)
+
+    response = TestClient(main.app).post(
+        "/api/process-recording",
+        files={"audio_file": ("a.wav", b"audio", "audio/wav")},
+        data={"fields_json": '{"fields": ["atriu stang"]}', "form_type": "echocardiography"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["time_map"] == TIME_MAP_JSON
@@ -3,6 +3,51 @@ import { authService } from '@/services/AuthService.js';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL?.replace('/api', '') || 'http://127.0.0.1:8000';
 const API_ENDPOINT = `${API_BASE_URL}/api/process-recording`;
+const STREAM_ENDPOINT = `${API_BASE_URL.replace(/^http/, 'ws')}/api/process-recording/stream`;
+const STREAMING_ENABLED = import.meta.env.VITE_STREAMING_TRANSCRIPTION === 'true';
+const STREAM_TIMESLICE_MS = 1000;
+const ASYNC_PROCESSING_ENABLED = import.meta.env.VITE_ASYNC_PROCESSING === 'true';
+const JOB_POLL_INTERVAL_MS = 2000;
+
+const pollJob = async (statusUrl) => {
+    while (true) {
+        const response = await fetch(`${API_BASE_URL}${statusUrl}`);
+        if (!response.ok) {
+            throw new Error(`Server error: ${response.status}`);
+        }
+        const job = await response.json();
+        if (job.status === 'completed') {
+            return job.result;
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'Processing failed');
+        }
+        await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+};
+
+const waitForJob = (job, onPartialFields = null) => new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE_URL}${job.events_url}`);
+
+    source.onmessage = (event) => {
+        const state = JSON.parse(event.data);
+        if (onPartialFields && state.partial_fields && Object.keys(state.partial_fields).length) {
+            onPartialFields(state.partial_fields);
+        }
+        if (state.status === 'completed') {
+            source.close();
+            resolve(state.result);
+        } else if (state.status === 'failed') {
+            source.close();
+            reject(new Error(state.error || 'Processing failed'));
+        }
+    };
+
+    source.onerror = () => {
+        source.close();
+        pollJob(job.status_url).then(resolve, reject);
+    };
+});
 
 export function useAudioProcessor() {
     const isRecording = ref(false);
@@ -15,20 +60,89 @@ export function useAudioProcessor() {
     const mediaRecorderRef = ref(null);
     const audioChunks = ref([]);
     let streamRef = null;
+    let socketRef = null;
+    let socketQueue = [];
+    let streamResultPromise = null;
+
+    const sendToStream = (payload) => {
+        if (!socketRef) {
+            return;
+        }
+        if (socketRef.readyState === WebSocket.CONNECTING) {
+            socketQueue.push(payload);
+        } else if (socketRef.readyState === WebSocket.OPEN) {
+            socketRef.send(payload);
+        }
+    };
+
+    const openStream = ({ fieldList, formType = null, transcriptionProvider = 'deepgram_whisper' }) => {
+        const socket = new WebSocket(STREAM_ENDPOINT);
+        socket.binaryType = 'arraybuffer';
+        socketQueue = [];
 
-    const startRecording = async () => {
+        streamResultPromise = new Promise((resolve) => {
+            socket.onopen = () => {
+                socket.send(JSON.stringify({
+                    fields: fieldList,
+                    form_type: formType,
+                    transcription_provider: transcriptionProvider,
+                }));
+                socketQueue.forEach(payload => socket.send(payload));
+                socketQueue = [];
+            };
+
+            socket.onmessage = (event) => {
+                const message = JSON.parse(event.data);
+                if (message.type === 'partial_transcript') {
+                    rawTranscript.value = message.text;
+                } else if (message.type === 'partial_fields') {
+                    parsedData.value = { ...(parsedData.value || {}), ...message.parsed_json };
+                } else if (message.type === 'field') {
+                    parsedData.value = { ...(parsedData.value || {}), [message.field]: message.value };
+                } else if (message.type === 'final') {
+                    resolve(message);
+                } else if (message.type === 'error') {
+                    console.error("Streaming processing failed:", message.detail);
+                    resolve(null);
+                }
+            };
+
+            socket.onerror = () => resolve(null);
+            socket.onclose = () => resolve(null);
+        });
+
+        socketRef = socket;
+    };
+
+    const closeStream = () => {
+        if (socketRef && socketRef.readyState <= WebSocket.OPEN) {
+            socketRef.close();
+        }
+        socketRef = null;
+        socketQueue = [];
+    };
+
+    const startRecording = async (streamOptions = null) => {
         error.value = null;
         rawTranscript.value = null;
         parsedData.value = null;
         audioBlob.value = null;
         audioChunks.value = [];
+        streamResultPromise = null;
 
         try {
+            if (STREAMING_ENABLED && streamOptions) {
+                openStream(streamOptions);
+            }
+
             streamRef = await navigator.mediaDevices.getUserMedia({ audio: true });
             mediaRecorderRef.value = new MediaRecorder(streamRef);
             
             mediaRecorderRef.value.ondataavailable = (event) => {
                 audioChunks.value.push(event.data);
+                if (event.data.size > 0) {
+                    sendToStream(event.data);
+                }
             };
 
             mediaRecorderRef.value.onstop = () => {
@@ -39,14 +153,18 @@ export function useAudioProcessor() {
                 if (streamRef) {
                     streamRef.getTracks().forEach(track => track.stop());
                 }
+
+                sendToStream(JSON.stringify({ type: 'stop' }));
             };
 
-            mediaRecorderRef.value.start();
+            mediaRecorderRef.value.start(socketRef ? STREAM_TIMESLICE_MS : undefined);
             isRecording.value = true;
         } catch (err) {
             console.error("Error accessing microphone:", err);
             error.value = "Could not access microphone. Check permissions.";
             isRecording.value = false;
+            closeStream();
+            streamResultPromise = null;
         }
     };
 
@@ -67,6 +185,20 @@ export function useAudioProcessor() {
             return;
         }
 
+        if (streamResultPromise) {
+            isProcessing.value = true;
+            const streamedResult = await streamResultPromise;
+            streamResultPromise = null;
+            closeStream();
+
+            if (streamedResult) {
+                rawTranscript.value = streamedResult.raw_transcript;
+                parsedData.value = streamedResult.parsed_json;
+                isProcessing.value = false;
+                return;
+            }
+        }
+
         isProcessing.value = true;
         error.value = null;
         rawTranscript.value = null;
@@ -85,6 +217,10 @@ export function useAudioProcessor() {
             
             formData.append('transcription_provider', transcriptionProvider);
 
+            if (ASYNC_PROCESSING_ENABLED) {
+                formData.append('async_mode', 'true');
+            }
+
             const authHeaders = authService.getAuthHeader();
             const headers = {};
             if (authHeaders.Authorization) {
@@ -102,7 +238,12 @@ export function useAudioProcessor() {
                 throw new Error(errorData.detail || `Server error: ${response.status}`);
             }
 
-            const result = await response.json();
+            let result = await response.json();
+            if (response.status === 202) {
+                result = await waitForJob(result, (partialFields) => {
+                    parsedData.value = { ...(parsedData.value || {}), ...partialFields };
+                });
+            }
             
             rawTranscript.value = result.raw_transcript;
             parsedData.value = result.parsed_json;
@@ -119,6 +260,7 @@ export function useAudioProcessor() {
         if (streamRef) {
             streamRef.getTracks().forEach(track => track.stop());
         }
+        closeStream();
     };
 
     return {
@@ -7,7 +7,7 @@ class ApiClient {
     this.baseURL = API_BASE_URL
   }
 
-  async request(endpoint, options = {}) {
+  async request(endpoint, { includeNextCursor = false, ...options } = {}) {
     const url = `${this.baseURL}${endpoint}`
     const authHeaders = authService.getAuthHeader()
     const config = {
@@ -40,7 +40,11 @@ class ApiClient {
         throw new Error(errorData.detail || `Eroare HTTP! status: ${response.status}`)
       }
 
-      return await response.json()
+      const data = await response.json()
+      if (includeNextCursor) {
+        return { data, nextCursor: response.headers.get('X-Next-Cursor') }
+      }
+      return data
     } catch (error) {
       console.error('API request failed:', error)
       throw error
@@ -69,14 +73,27 @@ class ApiClient {
     return this.request(endpoint, { method: 'DELETE' })
   }
 
-  async getPatients() {
-    return this.get('/patients/')
+  async getPage(endpoint, { limit = 100, cursor = null } = {}) {
+    const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''
+    return this.request(`${endpoint}?limit=${limit}${cursorParam}`, {
+      method: 'GET',
+      includeNextCursor: true,
+    })
+  }
+
+  async getPatients({ limit = 100, cursor = null } = {}) {
+    return this.getPage('/patients/', { limit, cursor })
   }
 
   async getPatient(id) {
     return this.get(`/patients/${id}`)
   }
 
+  async getPatientDocuments(id, { limit = 100, cursor = null } = {}) {
+    const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''
+    return this.get(`/patients/${id}/documents?limit=${limit}${cursorParam}`)
+  }
+
   async createPatient(patient) {
     return this.post('/patients', patient)
   }
@@ -10,6 +10,8 @@ import { cookieService } from '@/services/CookieService.js'
 export function usePatientViewModel() {
   const state = reactive({
     patients: [],
+    nextPatientsCursor: null,
+    isLoadingMore: false,
     currentPatient: null,
     isLoading: false,
     error: null,
@@ -41,33 +43,38 @@ export function usePatientViewModel() {
   const patientsCount = computed(() => state.patients.length)
   const filteredPatientsCount = computed(() => filteredPatients.value.length)
 
+  const toPatientForm = (patientData) => new PatientForm({
+    id: patientData.id,
+    name: patientData.name,
+    age: patientData.age,
+    gender: patientData.gender,
+    dateOfBirth: patientData.date_of_birth,
+    phone: patientData.phone,
+    email: patientData.email,
+    address: patientData.address,
+    medicalHistory: patientData.medical_history,
+    allergies: patientData.allergies,
+    currentMedications: patientData.current_medications,
+    bloodType: patientData.blood_type,
+    insuranceNumber: patientData.insurance_number,
+    emergencyContact: patientData.emergency_contact,
+    createdAt: patientData.created_at,
+    updatedAt: patientData.updated_at
+  })
+
+  // Only the newest page is loaded up front; older patients are fetched on
+  // demand with the cursor the backend returns in X-Next-Cursor.
   const loadPatients = async () => {
     state.isLoading = true
     state.error = null
 
     try {
       console.log('🔵 Loading patients from backend API...')
-      const patientsData = await apiClient.getPatients()
-      console.log('✅ Backend API response:', patientsData)
+      const page = await apiClient.getPatients()
+      console.log('✅ Backend API response:', page.data)
       
-      state.patients = patientsData.map(patientData => new PatientForm({
-        id: patientData.id,
-        name: patientData.name,
-        age: patientData.age,
-        gender: patientData.gender,
-        dateOfBirth: patientData.date_of_birth,
-        phone: patientData.phone,
-        email: patientData.email,
-        address: patientData.address,
-        medicalHistory: patientData.medical_history,
-        allergies: patientData.allergies,
-        currentMedications: patientData.current_medications,
-        bloodType: patientData.blood_type,
-        insuranceNumber: patientData.insurance_number,
-        emergencyContact: patientData.emergency_contact,
-        createdAt: patientData.created_at,
-        updatedAt: patientData.updated_at
-      }))
+      state.patients = page.data.map(toPatientForm)
+      state.nextPatientsCursor = page.nextCursor
       
       console.log(`✅ Loaded ${state.patients.length} patients from database`)
       toastService.info(`S-au încărcat ${state.patients.length} pacienți`)
@@ -83,6 +90,37 @@ export function usePatientViewModel() {
     }
   }
 
+  const loadMorePatients = async () => {
+    if (!state.nextPatientsCursor || state.isLoadingMore) return
+
+    state.isLoadingMore = true
+    try {
+      const page = await apiClient.getPatients({ cursor: state.nextPatientsCursor })
+      const loadedIds = new Set(state.patients.map(p => p.id))
+      state.patients.push(...page.data.filter(p => !loadedIds.has(p.id)).map(toPatientForm))
+      state.nextPatientsCursor = page.nextCursor
+    } catch (error) {
+      console.error('❌ Error loading more patients:', error)
+      toastService.error('Eșec la încărcarea pacienților', error.message)
+    } finally {
+      state.isLoadingMore = false
+    }
+  }
+
+  const ensurePatientLoaded = async (patientId) => {
+    const loaded = getPatientById(patientId)
+    if (loaded) return loaded
+
+    try {
+      const patient = toPatientForm(await apiClient.getPatient(patientId))
+      state.patients.push(patient)
+      return patient
+    } catch (error) {
+      console.error('❌ Error loading patient:', error)
+      return null
+    }
+  }
+
   const savePatientsToStorage = (patients) => {
     try {
       localStorage.setItem('s2t-patients', JSON.stringify(patients))
@@ -330,8 +368,12 @@ export function usePatientViewModel() {
 
     patientsCount,
     filteredPatientsCount,
+    hasMorePatients: computed(() => !!state.nextPatientsCursor),
+    isLoadingMore: computed(() => state.isLoadingMore),
 
     loadPatients,
+    loadMorePatients,
+    ensurePatientLoaded,
     createPatient,
     updatePatient,
     deletePatient,